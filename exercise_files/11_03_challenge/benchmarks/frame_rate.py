@@ -0,0 +1,59 @@
+# Compares full-frame printing before and after the buffered FrameWriter.
+# Run from the project folder: python -m benchmarks.frame_rate
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from canvas import Canvas, CanvasAxis
+
+FRAMES = 50
+
+
+def legacyPrint(canvas):
+    # What Canvas.print used to do: fork a shell to clear, then one print per row
+    os.system("cls" if os.name == "nt" else "clear")
+    for line in canvas.frameLines():
+        print(line)
+
+
+@contextmanager
+def silencedStdout():
+    # Redirects file descriptor 1 as well, so the child "clear" process is muted too
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def framesPerSecond(render, canvas):
+    with silencedStdout():
+        start = time.perf_counter()
+        for i in range(FRAMES):
+            canvas.setPos([i % canvas._x, i % canvas._y], "*", "green")
+            render(canvas)
+        elapsed = time.perf_counter() - start
+    return FRAMES / elapsed
+
+
+def main():
+    scenes = [(Canvas, 40, 40), (Canvas, 200, 60), (CanvasAxis, 200, 60)]
+    for canvasClass, width, height in scenes:
+        canvas = canvasClass(width, height)
+        before = framesPerSecond(legacyPrint, canvas)
+        after = framesPerSecond(canvasClass.print, canvas)
+        print(
+            "{:<10} {:>3}x{:<3} before: {:8.1f} fps  after: {:8.1f} fps".format(
+                canvasClass.__name__, width, height, before, after
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
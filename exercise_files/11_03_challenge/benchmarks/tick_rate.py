@@ -0,0 +1,56 @@
+# Ticks per second for 1, 10 and 100 scribes: the old thread-per-move loop
+# against inline moves and a reusable thread pool.
+# Run from the project folder: python -m benchmarks.tick_rate
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+from canvas import Canvas
+from scribes import TerminalScribe
+
+MOVES = 200
+
+
+def legacyRun(canvas):
+    # What Canvas.go used to do for every tick, minus the printing
+    programs = [list(scribe.steps()) for scribe in canvas.scribes]
+    max_moves = max([len(moves) for moves in programs])
+    for i in range(max_moves):
+        for moves in programs:
+            threads = []
+            if len(moves) > i:
+                args = moves[i][1] + [canvas]
+                threads.append(Thread(target=moves[i][0], args=args))
+            [thread.start() for thread in threads]
+            [thread.join() for thread in threads]
+
+
+def scene(scribeCount, executor=None):
+    scribes = []
+    for i in range(scribeCount):
+        scribe = TerminalScribe(color="green", pos=(i % 80, i % 40), degrees=i * 37)
+        scribe.forward(MOVES)
+        scribes.append(scribe)
+    return Canvas(80, 40, scribes=scribes, framerate=0, executor=executor)
+
+
+def ticksPerSecond(run, canvas):
+    start = time.perf_counter()
+    run(canvas)
+    return (MOVES + 1) / (time.perf_counter() - start)
+
+
+def main():
+    with ThreadPoolExecutor() as pool:
+        for scribeCount in [1, 10, 100]:
+            legacy = ticksPerSecond(legacyRun, scene(scribeCount))
+            inline = ticksPerSecond(Canvas.run, scene(scribeCount))
+            pooled = ticksPerSecond(Canvas.run, scene(scribeCount, pool))
+            print(
+                "{:>3} scribes  thread per move: {:8.0f}  inline: {:8.0f}  "
+                "pool: {:8.0f} ticks/s".format(scribeCount, legacy, inline, pooled)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,34 @@
-from .base import Canvas, CanvasAxis
+from .base import Canvas, CanvasAxis, SparseCanvas
 from .exceptions import TerminalScribeException, InvalidParameter
+from .renderers import (
+    Renderer,
+    NullRenderer,
+    TerminalRenderer,
+    DiffRenderer,
+    TextFileRenderer,
+    AsciicastRenderer,
+    ViewportRenderer,
+    DenseRenderer,
+    ThreadedRenderer,
+    FitRenderer,
+)
+from .viewport import Viewport
 
-__all__ = ["Canvas", "CanvasAxis", "TerminalScribeException", "InvalidParameter"]
+__all__ = [
+    "Canvas",
+    "CanvasAxis",
+    "SparseCanvas",
+    "TerminalScribeException",
+    "InvalidParameter",
+    "Renderer",
+    "NullRenderer",
+    "TerminalRenderer",
+    "DiffRenderer",
+    "TextFileRenderer",
+    "AsciicastRenderer",
+    "ViewportRenderer",
+    "DenseRenderer",
+    "ThreadedRenderer",
+    "FitRenderer",
+    "Viewport",
+]
@@ -0,0 +1,82 @@
+import asyncio
+import inspect
+
+from .tick import TickBuffer
+
+
+async def scribeMoves(moves, turns):
+    # One coroutine per scribe. Each turn taken from the queue is a
+    # (buffer, done) pair: the scribe runs its next move against the buffer
+    # and resolves done with True, or with False once its moves run out.
+    # A move may itself be a coroutine function, which is awaited.
+    while True:
+        buffer, done = await turns.get()
+        try:
+            # Generated programs may raise while producing their next step
+            step = next(moves, None)
+            if step is None:
+                done.set_result(False)
+                return
+            move, args = step
+            result = move(*args, buffer)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as error:
+            done.set_exception(error)
+            return
+        done.set_result(True)
+
+
+class AsyncTicks:
+    # Async iterator over the ticks of a canvas. Every scribe's moves are
+    # consumed by its own task; each tick hands every scribe a turn, waits
+    # for all of them, then merges their writes in scribe order, so the
+    # canvas ends up the same as with Canvas.run().
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.tasks = []
+        self.turns = []
+        self.index = 0
+        self.started = False
+
+    def __aiter__(self):
+        return self
+
+    def start(self):
+        self.started = True
+        for scribe in self.canvas.scribes:
+            turns = asyncio.Queue()
+            self.turns.append(turns)
+            self.tasks.append(asyncio.ensure_future(scribeMoves(scribe.steps(), turns)))
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        self.turns = []
+
+    async def __anext__(self):
+        if not self.started:
+            self.start()
+        loop = asyncio.get_running_loop()
+        turns = []
+        for queue in self.turns:
+            buffer, done = TickBuffer(self.canvas), loop.create_future()
+            queue.put_nowait((buffer, done))
+            turns.append((queue, buffer, done))
+        try:
+            moved = await asyncio.gather(*[done for queue, buffer, done in turns])
+        except BaseException:
+            self.close()
+            raise
+        self.turns = [queue for (queue, buffer, done), ok in zip(turns, moved) if ok]
+        if not any(moved):
+            self.close()
+            raise StopAsyncIteration
+        # Tick barrier: merge the writes in scribe order
+        for (queue, buffer, done), ok in zip(turns, moved):
+            if ok:
+                buffer.apply()
+        self.canvas.tick += 1
+        self.index += 1
+        return self.index - 1
@@ -1,36 +1,97 @@
 from .exceptions import TerminalScribeException, InvalidParameter
+from .grid import Grid, SparseGrid, BLANK
+from .frame import FrameWriter
+from .renderers import DiffRenderer, FitRenderer, NullRenderer, TerminalRenderer
+from .scheduler import FixedTimestep
+from .tick import TickBuffer
+from .aio import AsyncTicks
+from .shard import runShards
 from utils.validation import is_number
-import os, time, threading, json
+import sys, copy, shutil, json
 from threading import Thread
-from inspect import getmembers, ismethod
+
+
+# Layer that scribes (and setPos without a layer) draw into
+SCRIBE_LAYER = "scribes"
 
 
 class Canvas:
-    def __init__(self, width, height, scribes=[], framerate=0.05):
+    gridClass = Grid
+
+    def __init__(
+        self,
+        width,
+        height,
+        scribes=[],
+        framerate=0.05,
+        incremental=True,
+        renderer=None,
+        executor=None,
+    ):
         if not is_number(width):
             raise InvalidParameter("Width must be a number")
         self._x = width
         if not is_number(height):
             raise InvalidParameter("Height must be a number")
         self._y = height
-        self._canvas = [[" " for y in range(self._y)] for x in range(self._x)]
+        self._canvas = self.gridClass(self._x, self._y)
         self.scribes = scribes
 
         if not is_number(framerate):
             raise InvalidParameter("Framerate must be a number")
         self.framerate = framerate
+        # Redraw only the cells that changed after the first full frame
+        self.incremental = incremental
+        self.writer = FrameWriter()
+        # Renderer used by go(); None picks a terminal renderer
+        self.renderer = renderer
+        # Number of ticks run so far; the simulation clock is tick * framerate
+        self.tick = 0
+        # Optional concurrent.futures executor that runs each tick's moves
+        # concurrently, writing through per-scribe TickBuffers. By default
+        # moves run inline, one scribe after another.
+        self.executor = executor
+        # Optional layer stack. Until a layer is added, scribes draw straight
+        # into self._canvas; afterwards self._canvas holds the composite.
+        self._layers = {}
+        self._layerOrder = []
+        self._static = set()
+        self._background = None
 
     def toDict(self):
-        return {
+        data = {
             "classname": type(self).__name__,
             "x": self._x,
             "y": self._y,
-            "canvas": self._canvas,
+            **self._canvas.toDict(),
             "scribes": [scribe.toDict() for scribe in self.scribes],
         }
+        if self._layers:
+            data["layers"] = self._layersToDict(self._layerStack())
+        return data
+
+    def _layerStack(self, snapshot=False):
+        # (name, static, grid) for every layer, bottom to top
+        return [
+            (
+                name,
+                name in self._static,
+                self._layers[name].snapshot() if snapshot else self._layers[name],
+            )
+            for name in self._layerOrder
+        ]
+
+    @staticmethod
+    def _layersToDict(stack):
+        return [
+            {"name": name, "static": static, **grid.toDict()}
+            for name, static, grid in stack
+        ]
 
     @staticmethod
     def fromDict(data):
+        import scribes as scribe_classes
+
         if not isinstance(data, dict):
             raise TerminalScribeException("Input to fromDict must be a dictionary")
         canvas_class = globals()[data["classname"]]
@@ -43,15 +104,63 @@ class Canvas:
             )
             if not isinstance(scribe_classname, str):
                 raise TerminalScribeException("Scribe classname is missing or invalid")
-            scribe_class = globals()[scribe_classname]
+            scribe_class = getattr(scribe_classes, scribe_classname)
             scribes.append(scribe_class.fromDict(scribe))
         canvas = canvas_class(data["x"], data["y"], scribes=scribes)
-        canvas._canvas = data["canvas"]
+        for layer in data.get("layers", []):
+            if layer["name"] != SCRIBE_LAYER:
+                canvas.addLayer(layer["name"], static=layer["static"])
+            canvas._layers[layer["name"]].load(layer)
+        canvas._canvas.load(data)
+        if canvas._layers:
+            # The composite is loaded as saved; only the background is rebuilt,
+            # from the cells the static layers actually hold
+            cells = set()
+            for name in canvas._static:
+                cells.update(canvas._layers[name].populated())
+            canvas._updateBackground(cells)
         return canvas
 
-    def toFile(self, name):
-        with open(name + ".json", "w") as f:
-            f.write(json.dumps(self.toDict()))
+    def snapshot(self):
+        # Read-only copy of the canvas as it is now. Cells are shared with
+        # the live canvas copy-on-write, so this is cheap to take per frame.
+        snapshot = copy.copy(self)
+        snapshot._canvas = self._canvas.snapshot()
+        snapshot.scribes = list(self.scribes)
+        if self._layers:
+            snapshot._layers = {
+                name: layer.snapshot() for name, layer in self._layers.items()
+            }
+            snapshot._background = self._background.snapshot()
+        return snapshot
+
+    def toFile(self, name, background=False):
+        if not background:
+            with open(name + ".json", "w") as f:
+                f.write(json.dumps(self.toDict()))
+            return None
+
+        # Scribes are serialized now; the grid is serialized and written from
+        # a snapshot on another thread while the simulation keeps running
+        data = {
+            "classname": type(self).__name__,
+            "x": self._x,
+            "y": self._y,
+            "scribes": [scribe.toDict() for scribe in self.scribes],
+        }
+        grid = self._canvas.snapshot()
+        layers = self._layerStack(snapshot=True)
+
+        def write():
+            data.update(grid.toDict())
+            if layers:
+                data["layers"] = self._layersToDict(layers)
+            with open(name + ".json", "w") as f:
+                f.write(json.dumps(data))
+
+        thread = Thread(target=write)
+        thread.start()
+        return thread
 
     @staticmethod
     def fromFile(name):
@@ -78,32 +187,278 @@ class Canvas:
             -1 if self.hitsHorizontalWall(point) else 1,
         ]
 
-    def setPos(self, pos, mark):
+    def addLayer(self, name, static=True):
+        # Static layers (axes, titles, grids) sit below every dynamic layer
+        # and are pre-composited into one background, so they cost nothing
+        # per frame and scribes cannot overwrite them. Dynamic layers stack
+        # above the scribe layer in the order they are added.
+        if name in self._layers or name == SCRIBE_LAYER:
+            raise InvalidParameter("Layer {} already exists".format(name))
+        if not self._layers:
+            scribeLayer = self.gridClass(self._x, self._y, trackDirty=False)
+            scribeLayer.load(self._canvas.toDict())
+            self._layers[SCRIBE_LAYER] = scribeLayer
+            self._layerOrder = [SCRIBE_LAYER]
+            self._background = self.gridClass(self._x, self._y, trackDirty=False)
+        self._layers[name] = self.gridClass(self._x, self._y, trackDirty=False)
+        if static:
+            self._static.add(name)
+            self._layerOrder.insert(len(self._static) - 1, name)
+        else:
+            self._layerOrder.append(name)
+
+    def _target(self, layer):
+        if not self._layers and layer in (None, SCRIBE_LAYER):
+            return self._canvas
+        if layer is None:
+            layer = SCRIBE_LAYER
+        if layer not in self._layers:
+            raise InvalidParameter("Unknown layer {}".format(layer))
+        return self._layers[layer]
+
+    def _written(self, cells, layer):
+        # Recomposites only the cells that were just written to a layer
+        if not self._layers:
+            return
+        if layer in self._static:
+            self._composeBackground(cells)
+        else:
+            self._compose(cells)
+
+    def _composeBackground(self, cells):
+        self._updateBackground(cells)
+        self._compose(cells)
+
+    def _updateBackground(self, cells):
+        statics = [
+            self._layers[name]
+            for name in reversed(self._layerOrder[: len(self._static)])
+        ]
+        for x, y in cells:
+            for grid in statics:
+                if grid.get(x, y) != BLANK:
+                    self._background.set(x, y, grid.get(x, y), grid.getColor(x, y))
+                    break
+            else:
+                self._background.set(x, y, BLANK)
+
+    def _compose(self, cells):
+        dynamics = [
+            self._layers[name]
+            for name in reversed(self._layerOrder[len(self._static) :])
+        ]
+        for x, y in cells:
+            source = self._background
+            for grid in dynamics:
+                if grid.get(x, y) != BLANK:
+                    source = grid
+                    break
+            self._canvas.set(x, y, source.get(x, y), source.getColor(x, y))
+
+    def setPos(self, pos, mark, color=None, layer=None):
+        try:
+            x, y = round(pos[0]), round(pos[1])
+            self._target(layer).set(x, y, mark, color)
+            self._written([(x, y)], layer)
+        except Exception as e:
+            raise TerminalScribeException(str(e))
+
+    def setMany(self, points, mark, color=None, layer=None):
+        # Rounds and bounds-checks every point in one pass. Points outside
+        # the canvas are skipped and returned instead of raising.
+        width, height = self._canvas.width, self._canvas.height
+        cells = []
+        outside = []
+        for point in points:
+            x, y = round(point[0]), round(point[1])
+            if 0 <= x < width and 0 <= y < height:
+                cells.append((x, y))
+            else:
+                outside.append(point)
         try:
-            self._canvas[round(pos[0])][round(pos[1])] = mark
+            self._target(layer).setMany(cells, mark, color)
+            self._written(cells, layer)
         except Exception as e:
             raise TerminalScribeException(str(e))
+        return outside
+
+    def fill(self, topLeft, bottomRight, mark, color=None, layer=None):
+        # Fills the rectangle between two corners (inclusive), clipped to the canvas
+        x0 = max(round(topLeft[0]), 0)
+        y0 = max(round(topLeft[1]), 0)
+        x1 = min(round(bottomRight[0]) + 1, self._canvas.width)
+        y1 = min(round(bottomRight[1]) + 1, self._canvas.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        try:
+            self._target(layer).fill(x0, y0, x1, y1, mark, color)
+            if self._layers:
+                self._written(
+                    [(x, y) for y in range(y0, y1) for x in range(x0, x1)], layer
+                )
+        except Exception as e:
+            raise TerminalScribeException(str(e))
+
+    def drawAxes(self, layer="background"):
+        if layer not in self._layers:
+            self.addLayer(layer)
+        midX = self._x // 2
+        midY = self._y // 2
+        self.fill([0, midY], [self._x - 1, midY], "-", layer=layer)
+        self.fill([midX, 0], [midX, self._y - 1], "|", layer=layer)
+        self.setPos([midX, midY], "+", layer=layer)
+
+    def addTitle(self, title, layer="background"):
+        if layer not in self._layers:
+            self.addLayer(layer)
+        for i, char in enumerate(title[: self._x]):
+            self.setPos([i, 0], char, layer=layer)
 
     def clear(self):
-        os.system("cls" if os.name == "nt" else "clear")
-
-    def go(self):
-        max_moves = max([len(scribe.moves) for scribe in self.scribes])
-        for i in range(max_moves):
-            for scribe in self.scribes:
-                threads = []
-                if len(scribe.moves) > i:
-                    args = scribe.moves[i][1] + [self]
-                    threads.append(Thread(target=scribe.moves[i][0], args=args))
-                [thread.start() for thread in threads]
-                [thread.join() for thread in threads]
-            self.print()
-            time.sleep(self.framerate)
+        self.writer.clear()
+
+    def _ticks(self):
+        # Runs every scribe's next move, then yields the tick number, until
+        # every scribe's program is exhausted. Moves are pulled from each
+        # scribe as they are needed, so programs may be unbounded.
+        streams = [scribe.steps() for scribe in self.scribes]
+        i = 0
+        while True:
+            moves = []
+            running = []
+            for stream in streams:
+                step = next(stream, None)
+                if step is not None:
+                    moves.append(step)
+                    running.append(stream)
+            if not moves:
+                return
+            streams = running
+            if self.executor is None:
+                for move, args in moves:
+                    move(*args, self)
+            else:
+                buffers = [TickBuffer(self) for move in moves]
+                futures = [
+                    self.executor.submit(move, *args, buffer)
+                    for (move, args), buffer in zip(moves, buffers)
+                ]
+                for future in futures:
+                    future.result()
+                # Tick barrier: merge the writes in scribe order
+                for buffer in buffers:
+                    buffer.apply()
+            self.tick += 1
+            yield i
+            i += 1
+
+    def fitsTerminal(self, size=None):
+        columns, lines = size or shutil.get_terminal_size()
+        return self.screenWidth() <= columns and self.screenHeight() < lines
+
+    def viewportScreenSize(self, width, height):
+        # Terminal columns and lines taken by a viewport of width x height cells
+        return 2 * width - 1, height
+
+    def viewportLines(self, viewport, plain=False):
+        # Frame lines for the part of the canvas a viewport shows
+        return viewport.frameLines(plain)
+
+    def defaultRenderer(self):
+        if self.renderer is not None:
+            return self.renderer
+        if self.incremental:
+            renderer = DiffRenderer(self.writer)
+        else:
+            renderer = TerminalRenderer(self.writer)
+        if sys.stdout.isatty():
+            # Frames that wrap or scroll make the terminal reflow every tick,
+            # so whenever the terminal is too small the canvas is scaled down
+            return FitRenderer("scale", self.writer, whenFits=renderer)
+        return renderer
+
+    def go(self, renderer=None, tickInterval=None, frameInterval=None):
+        # Runs ticks every tickInterval seconds (default: framerate) and
+        # renders every frameInterval seconds (default: every tick), dropping
+        # frames when rendering falls behind. Returns the achieved rates.
+        renderer = renderer or self.defaultRenderer()
+        self.scheduler = FixedTimestep(
+            self.framerate if tickInterval is None else tickInterval, frameInterval
+        )
+        renderer.start(self)
+        try:
+            return self.scheduler.run(self._ticks(), lambda: renderer.frame(self))
+        finally:
+            renderer.stop(self)
+
+    async def goAsync(self, renderer=None, tickInterval=None, frameInterval=None):
+        # go() as a coroutine: every scribe's moves run in their own task,
+        # ticks are paced with asyncio.sleep and other tasks can share the
+        # event loop, e.g. asyncio.run(canvas.goAsync()). Frames are still
+        # drawn on the loop; wrap slow renderers in a ThreadedRenderer.
+        renderer = renderer or self.defaultRenderer()
+        self.scheduler = FixedTimestep(
+            self.framerate if tickInterval is None else tickInterval, frameInterval
+        )
+        ticks = AsyncTicks(self)
+        renderer.start(self)
+        try:
+            return await self.scheduler.runAsync(ticks, lambda: renderer.frame(self))
+        finally:
+            ticks.close()
+            renderer.stop(self)
+
+    def run(self, captureEvery=None, renderer=None):
+        # Headless go(): runs every move as fast as possible without sleeping,
+        # and without output unless a renderer is given. With captureEvery=n,
+        # a snapshot of every nth frame (and of the last one) is returned.
+        renderer = renderer or NullRenderer()
+        frames = []
+        last = None
+        renderer.start(self)
+        try:
+            for i in self._ticks():
+                last = i
+                renderer.frame(self)
+                if captureEvery and (i + 1) % captureEvery == 0:
+                    frames.append(self.snapshot())
+        finally:
+            renderer.stop(self)
+        if captureEvery and last is not None and (last + 1) % captureEvery != 0:
+            frames.append(self.snapshot())
+        return frames
+
+    def runSharded(self, processes=None):
+        # Headless run() over worker processes (default: one per CPU) that
+        # draw into a shared memory grid, for scenes where a single process
+        # is CPU-bound. Ticks are kept in step with a barrier and writes to
+        # the same cell resolve as in a serial run, so the final canvas and
+        # scribe positions match run(). Custom scribes drawing from the random
+        # module itself get different numbers in each worker; RandomWalkScribe
+        # keeps its own generator for this. The shared grid is dense, so
+        # SparseCanvas is not supported.
+        return runShards(self, processes)
+
+    # 1-based terminal column of a cell, as laid out by print()
+    def screenColumn(self, x):
+        return 2 * x + 1
+
+    def screenHeight(self):
+        return self._y
+
+    def screenWidth(self):
+        return 2 * self._x - 1
+
+    def frameLines(self, plain=False):
+        if plain:
+            return [self._canvas.plainLine(y) for y in range(self._y)]
+        return [self._canvas.line(y) for y in range(self._y)]
 
     def print(self):
-        self.clear()
-        for y in range(self._y):
-            print(" ".join([col[y] for col in self._canvas]))
+        TerminalRenderer(self.writer).frame(self)
+
+    def printChanges(self):
+        DiffRenderer(self.writer).writeChanges(self)
 
 
 class CanvasAxis(Canvas):
@@ -115,9 +470,55 @@ class CanvasAxis(Canvas):
             return " " + str(num)
         return str(num)
 
-    def print(self):
-        self.clear()
-        for y in range(self._y):
-            print(self.formatAxisNumber(y) + " ".join([col[y] for col in self._canvas]))
+    def screenColumn(self, x):
+        return 2 * x + 3
+
+    def screenHeight(self):
+        return self._y + 1
+
+    def screenWidth(self):
+        return max(2 * self._x + 1, len(self.axisGutters()[1]))
+
+    def axisGutters(self):
+        # Left gutter strings and the bottom axis line only depend on the
+        # canvas size, so they are built once per size and reused every frame
+        size = (self._x, self._y)
+        if getattr(self, "_axisSize", None) != size:
+            self._gutters = [self.formatAxisNumber(y) for y in range(self._y)]
+            self._axisLine = " ".join(
+                [self.formatAxisNumber(x) for x in range(self._x)]
+            )
+            self._axisSize = size
+        return self._gutters, self._axisLine
+
+    def axisLabel(self, start, zoom=1):
+        # Label for the cells [start, start + zoom): the multiple of 5 among
+        # them, if there is one
+        first = -(-start // 5) * 5
+        return self.formatAxisNumber(first) if first < start + zoom else "  "
+
+    def viewportScreenSize(self, width, height):
+        return max(2 * width + 1, 3 * width - 1), height + 1
+
+    def viewportLines(self, viewport, plain=False):
+        zoom = viewport.zoom
+        lines = [
+            self.axisLabel(y, zoom) + line
+            for y, line in zip(viewport.rows(), viewport.frameLines(plain))
+        ]
+        lines.append(" ".join(self.axisLabel(x, zoom) for x in viewport.columns()))
+        return lines
+
+    def frameLines(self, plain=False):
+        gutters, axisLine = self.axisGutters()
+        lines = [
+            gutters[y] + line for y, line in enumerate(super().frameLines(plain))
+        ]
+        lines.append(axisLine)
+        return lines
+
 
-        print(" ".join([self.formatAxisNumber(x) for x in range(self._x)]))
+class SparseCanvas(Canvas):
+    # For very large, mostly empty scenes: cells are stored in tiles that
+    # are allocated on first write, and only populated tiles are saved
+    gridClass = SparseGrid
@@ -0,0 +1,68 @@
+from .grid import BLANK, renderCells
+
+# Braille cells are 2 dots wide and 4 tall. BRAILLE_ROW_BITS[r][pair] is the
+# dot pattern for source row r of a block whose left/right cells are set
+# according to pair (bit 0 left, bit 1 right).
+BRAILLE_DOT_BITS = [(0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80)]
+BRAILLE_ROW_BITS = [
+    [(left if pair & 1 else 0) | (right if pair & 2 else 0) for pair in range(4)]
+    for left, right in BRAILLE_DOT_BITS
+]
+BRAILLE = [chr(0x2800 + bits) for bits in range(256)]
+
+# Half blocks are 1 cell wide and 2 tall: bit 0 top, bit 1 bottom
+HALF_BLOCKS = [" ", "▀", "▄", "█"]
+
+MODES = {
+    # mode: (block width, block height)
+    "braille": (2, 4),
+    "halfblock": (1, 2),
+}
+
+
+def _occupied(row):
+    return [glyph != BLANK for glyph in row]
+
+
+def _color(colors, x0, x1):
+    # First colored cell in the block, so scribe heads keep their color
+    for rowColors in colors:
+        for color in rowColors[x0:x1]:
+            if color:
+                return color
+    return 0
+
+
+def denseLines(grid, mode="braille", plain=False):
+    if mode not in MODES:
+        raise ValueError("Unknown dense mode {}".format(mode))
+    blockWidth, blockHeight = MODES[mode]
+    width = grid.width
+    lines = []
+    for y0 in range(0, grid.height, blockHeight):
+        rows = range(y0, min(y0 + blockHeight, grid.height))
+        colors = [grid.colors(y) for y in rows]
+        if mode == "braille":
+            codes = [0] * ((width + 1) // 2)
+            for r, y in enumerate(rows):
+                occupied = _occupied(grid.row(y)) + [False]
+                rowBits = BRAILLE_ROW_BITS[r]
+                for i in range(len(codes)):
+                    codes[i] |= rowBits[occupied[2 * i] | occupied[2 * i + 1] << 1]
+            glyphs = [BRAILLE[code] for code in codes]
+        else:
+            top = _occupied(grid.row(rows[0]))
+            if len(rows) > 1:
+                bottom = _occupied(grid.row(rows[1]))
+            else:
+                bottom = [False] * width
+            glyphs = [HALF_BLOCKS[t | b << 1] for t, b in zip(top, bottom)]
+        if plain:
+            lines.append("".join(glyphs))
+            continue
+        cells = [
+            (glyph, _color(colors, i * blockWidth, (i + 1) * blockWidth))
+            for i, glyph in enumerate(glyphs)
+        ]
+        lines.append(renderCells(cells, separator=""))
+    return lines
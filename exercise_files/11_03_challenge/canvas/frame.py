@@ -0,0 +1,23 @@
+import sys
+
+# Cursor home followed by erase display, so a frame always starts top-left
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+
+class FrameWriter:
+    # Writes whole frames to the terminal with a single buffered write,
+    # instead of forking a shell to clear and printing row by row
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, text):
+        # Resolved per call so redirected stdout (tests, benchmarks) is honoured
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    def clear(self):
+        self.write(CLEAR_SCREEN)
+
+    def frame(self, lines):
+        self.write(CLEAR_SCREEN + "\n".join(lines) + "\n")
@@ -0,0 +1,512 @@
+from array import array
+import copy
+from termcolor import colored, COLORS
+import re
+
+BLANK = " "
+BLANK_CODEPOINT = ord(BLANK)
+
+# Color plane values index into this palette; 0 means "no color"
+PALETTE = [None] + list(COLORS)
+COLOR_INDEX = {color: i for i, color in enumerate(PALETTE)}
+ANSI_CODES = {code: color for color, code in COLORS.items()}
+
+# Matches the escape sequences termcolor wraps around a mark
+ANSI_ESCAPE = re.compile(r"\x1b\[([0-9;]*)m")
+
+# Matches the non-blank cells of a one-byte glyph row
+NON_BLANK = re.compile(rb"[^ ]")
+
+
+def parseMark(mark):
+    # Splits a (possibly colored) mark into its glyph and color name
+    if len(mark) == 1:
+        return mark, None
+    color = None
+    for codes in ANSI_ESCAPE.findall(mark):
+        for code in codes.split(";"):
+            if code.isdigit() and int(code) in ANSI_CODES:
+                color = ANSI_CODES[int(code)]
+    return ANSI_ESCAPE.sub("", mark), color
+
+
+def encodeMark(mark, color=None):
+    # Returns the (codepoint, palette index) pair stored for a mark
+    glyph, markColor = parseMark(mark)
+    if len(glyph) != 1:
+        raise ValueError("Mark must be a single visible character")
+    if color is None:
+        color = markColor
+    if color not in COLOR_INDEX:
+        raise ValueError("Unknown color {}".format(color))
+    return ord(glyph), COLOR_INDEX[color]
+
+
+def colorEscapes(index):
+    # (start, reset) escapes for a palette color. Built through termcolor so
+    # its rules for when to emit color (tty, NO_COLOR, FORCE_COLOR) still apply.
+    start, reset = colored("\0", PALETTE[index]).split("\0")
+    return start, reset
+
+
+def renderCells(cells, separator=" "):
+    # Joins (glyph, palette index) pairs, emitting an escape only when the
+    # color changes along the row and a single reset at the end
+    output = []
+    current = 0
+    escapes = {}
+    reset = ""
+    for i, (glyph, color) in enumerate(cells):
+        if i:
+            output.append(separator)
+        if color != current:
+            if color:
+                if color not in escapes:
+                    escapes[color], reset = colorEscapes(color)
+                output.append(escapes[color])
+            else:
+                output.append(reset)
+            current = color
+        output.append(glyph)
+    if current:
+        output.append(reset)
+    return "".join(output)
+
+
+class DirtySpans:
+    # Cells written since the last frame, kept per row as a few disjoint
+    # [x0, x1) spans instead of one entry per cell, so a fill costs one span
+    # per row. A row with more than maxSpans spans collapses into a single
+    # span, which may cover unwritten cells; redrawing those is harmless.
+    maxSpans = 16
+
+    def __init__(self):
+        self.spans = {}
+
+    def __bool__(self):
+        return bool(self.spans)
+
+    def __len__(self):
+        # Number of cells covered
+        return sum(x1 - x0 for row in self.spans.values() for x0, x1 in row)
+
+    def add(self, x, y):
+        row = self.spans.get(y)
+        if row is None:
+            self.spans[y] = [[x, x + 1]]
+            return
+        for span in row:
+            if span[0] <= x < span[1]:
+                return
+        self.addSpan(y, x, x + 1)
+
+    def addSpan(self, y, x0, x1):
+        row = self.spans.get(y)
+        if row is None:
+            self.spans[y] = [[x0, x1]]
+            return
+        # Merges every span that overlaps or touches [x0, x1)
+        merged = [x0, x1]
+        kept = []
+        for span in row:
+            if span[1] < merged[0] or span[0] > merged[1]:
+                kept.append(span)
+            else:
+                merged = [min(span[0], merged[0]), max(span[1], merged[1])]
+        kept.append(merged)
+        kept.sort()
+        if len(kept) > self.maxSpans:
+            kept = [[kept[0][0], max(span[1] for span in kept)]]
+        self.spans[y] = kept
+
+    def update(self, other):
+        for y, row in other.spans.items():
+            for x0, x1 in row:
+                self.addSpan(y, x0, x1)
+
+    def rows(self):
+        # (y, x0, x1) in row-major order
+        return [
+            (y, x0, x1) for y, row in sorted(self.spans.items()) for x0, x1 in row
+        ]
+
+    def cells(self):
+        return [(x, y) for y, x0, x1 in self.rows() for x in range(x0, x1)]
+
+
+class Grid:
+    # Row-major storage with two planes per row: glyph codepoints (one byte
+    # per cell, widened to four only if a non latin-1 glyph is written into
+    # the row) and palette color indexes (one byte per cell).
+    def __init__(self, width, height, trackDirty=True):
+        self.width = int(width)
+        self.height = int(height)
+        self._glyphs = [
+            array("B", BLANK.encode() * self.width) for y in range(self.height)
+        ]
+        self._colors = [bytearray(self.width) for y in range(self.height)]
+        # Cells written since the last frame, or None for grids that are
+        # never rendered directly (layers)
+        self._dirty = DirtySpans() if trackDirty else None
+        # Rendered rows by y, dropped whenever a cell in the row is written
+        self._lines = {}
+        # Rows still shared with a snapshot, copied before their next write
+        self._shared = set()
+        self._frozen = False
+
+    def inBounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y):
+        return chr(self._glyphs[y][x])
+
+    def getColor(self, x, y):
+        return PALETTE[self._colors[y][x]]
+
+    def _checkBounds(self, x, y):
+        if not self.inBounds(x, y):
+            raise IndexError(
+                "Position ({}, {}) is outside the {}x{} grid".format(
+                    x, y, self.width, self.height
+                )
+            )
+
+    def _parse(self, mark, color):
+        return encodeMark(mark, color)
+
+    def _checkWritable(self):
+        if self._frozen:
+            raise TypeError("Grid snapshots are read-only")
+
+    def _unshare(self, y):
+        self._glyphs[y] = self._glyphs[y][:]
+        self._colors[y] = bytearray(self._colors[y])
+        self._shared.discard(y)
+
+    def _write(self, x, y, codepoint, colorIndex):
+        self._checkWritable()
+        if y in self._shared:
+            self._unshare(y)
+        row = self._glyphs[y]
+        if codepoint > 0xFF and row.typecode == "B":
+            row = self._glyphs[y] = array("I", row)
+        row[x] = codepoint
+        self._colors[y][x] = colorIndex
+        if self._dirty is not None:
+            self._dirty.add(x, y)
+        self._lines.pop(y, None)
+
+    def set(self, x, y, mark, color=None):
+        self._checkBounds(x, y)
+        self._write(x, y, *self._parse(mark, color))
+
+    def setMany(self, cells, mark, color=None):
+        # Cells must already be in bounds; the mark is only parsed once
+        codepoint, colorIndex = self._parse(mark, color)
+        for x, y in cells:
+            self._write(x, y, codepoint, colorIndex)
+
+    def fill(self, x0, y0, x1, y1, mark, color=None):
+        # Fills the half-open rectangle [x0, x1) x [y0, y1) a row slice at a time
+        codepoint, colorIndex = self._parse(mark, color)
+        span = x1 - x0
+        if span <= 0:
+            return
+        self._checkWritable()
+        for y in range(y0, y1):
+            if y in self._shared:
+                self._unshare(y)
+            row = self._glyphs[y]
+            if codepoint > 0xFF and row.typecode == "B":
+                row = self._glyphs[y] = array("I", row)
+            row[x0:x1] = array(row.typecode, [codepoint]) * span
+            self._colors[y][x0:x1] = bytes([colorIndex]) * span
+            if self._dirty is not None:
+                self._dirty.addSpan(y, x0, x1)
+            self._lines.pop(y, None)
+
+    def snapshot(self):
+        # Read-only view of the grid as it is now. Only the row lists are
+        # copied; each row is copied on the live grid's next write to it.
+        snapshot = copy.copy(self)
+        snapshot._glyphs = list(self._glyphs)
+        snapshot._colors = list(self._colors)
+        snapshot._lines = dict(self._lines)
+        snapshot._dirty = None
+        snapshot._shared = set()
+        snapshot._frozen = True
+        self._shared = set(range(self.height))
+        return snapshot
+
+    def takeDirty(self):
+        # Cells written since the last call, in row-major order
+        if not self._dirty:
+            return []
+        dirty, self._dirty = self._dirty, DirtySpans()
+        return dirty.cells()
+
+    def takeDirtySpans(self):
+        # takeDirty() as (y, x0, x1) row spans, without a tuple per cell
+        if not self._dirty:
+            return []
+        dirty, self._dirty = self._dirty, DirtySpans()
+        return dirty.rows()
+
+    def dirtyCount(self):
+        return len(self._dirty) if self._dirty else 0
+
+    def clean(self):
+        if self._dirty is not None:
+            self._dirty = DirtySpans()
+
+    def swapDirty(self, dirty=None):
+        # Hands over the dirty spans, replacing them with dirty
+        taken = self._dirty
+        self._dirty = DirtySpans() if dirty is None else dirty
+        return taken
+
+    def row(self, y, x0=0, x1=None):
+        # Glyphs of row y, optionally only columns [x0, x1)
+        row = self._glyphs[y]
+        if x0 or x1 is not None:
+            row = row[x0:x1]
+        if row.typecode == "B":
+            return row.tobytes().decode("latin-1")
+        return "".join(map(chr, row))
+
+    def colors(self, y, x0=0, x1=None):
+        if x0 or x1 is not None:
+            return self._colors[y][x0:x1]
+        return self._colors[y]
+
+    def cell(self, x, y):
+        # (glyph, palette index) pair
+        return chr(self._glyphs[y][x]), self._colors[y][x]
+
+    def mark(self, x, y):
+        glyph = chr(self._glyphs[y][x])
+        index = self._colors[y][x]
+        return colored(glyph, PALETTE[index]) if index else glyph
+
+    def marks(self, y):
+        # Each cell of the row with its own escapes
+        colors = self.colors(y)
+        return [
+            colored(glyph, PALETTE[colors[x]]) if colors[x] else glyph
+            for x, glyph in enumerate(self.row(y))
+        ]
+
+    def line(self, y):
+        # Row as printed by Canvas.print, reused until the row changes
+        line = self._lines.get(y)
+        if line is None:
+            line = self._lines[y] = renderCells(zip(self.row(y), self.colors(y)))
+        return line
+
+    def plainLine(self, y):
+        return " ".join(self.row(y))
+
+    def populated(self):
+        # (x, y) of every non-blank cell, row by row
+        for y, row in enumerate(self._glyphs):
+            if row.typecode == "B":
+                for match in NON_BLANK.finditer(row.tobytes()):
+                    yield match.start(), y
+            else:
+                for x, codepoint in enumerate(row):
+                    if codepoint != BLANK_CODEPOINT:
+                        yield x, y
+
+    def toDict(self):
+        return {
+            "canvas": [self.row(y) for y in range(self.height)],
+            "colors": [
+                [x, y, PALETTE[index]]
+                for y in range(self.height)
+                for x, index in enumerate(self._colors[y])
+                if index
+            ],
+        }
+
+    def load(self, data):
+        canvas = data["canvas"]
+        if canvas and not isinstance(canvas[0], str):
+            # Column-major list of (possibly colored) marks, as written by
+            # earlier versions of Canvas.toDict
+            for x, column in enumerate(canvas):
+                for y, mark in enumerate(column):
+                    if mark != BLANK:
+                        self.set(x, y, mark)
+            return
+        for y, row in enumerate(canvas):
+            for x, glyph in enumerate(row):
+                if glyph != BLANK:
+                    self.set(x, y, glyph)
+        for x, y, color in data.get("colors", []):
+            self.set(x, y, self.get(x, y), color)
+
+
+class Tile:
+    def __init__(self, size):
+        self.glyphs = array("B", BLANK.encode() * (size * size))
+        self.colors = bytearray(size * size)
+
+    def copy(self):
+        tile = copy.copy(self)
+        tile.glyphs = self.glyphs[:]
+        tile.colors = bytearray(self.colors)
+        return tile
+
+
+class SparseGrid(Grid):
+    # Same interface as Grid, but cells live in fixed-size square tiles that
+    # are only allocated on first write. Untouched tiles read as blank.
+    tileSize = 64
+
+    def __init__(self, width, height, trackDirty=True):
+        self.width = int(width)
+        self.height = int(height)
+        self._tiles = {}
+        self._dirty = DirtySpans() if trackDirty else None
+        self._lines = {}
+        # Tile keys still shared with a snapshot
+        self._shared = set()
+        self._frozen = False
+
+    def _tile(self, x, y):
+        return self._tiles.get((x // self.tileSize, y // self.tileSize))
+
+    def _offset(self, x, y):
+        return (y % self.tileSize) * self.tileSize + x % self.tileSize
+
+    def get(self, x, y):
+        tile = self._tile(x, y)
+        return chr(tile.glyphs[self._offset(x, y)]) if tile else BLANK
+
+    def getColor(self, x, y):
+        tile = self._tile(x, y)
+        return PALETTE[tile.colors[self._offset(x, y)]] if tile else None
+
+    def _write(self, x, y, codepoint, colorIndex):
+        self._checkWritable()
+        key = (x // self.tileSize, y // self.tileSize)
+        tile = self._tiles.get(key)
+        if tile is None:
+            if codepoint == BLANK_CODEPOINT and not colorIndex:
+                return
+            tile = self._tiles[key] = Tile(self.tileSize)
+        elif key in self._shared:
+            tile = self._tiles[key] = tile.copy()
+            self._shared.discard(key)
+        if codepoint > 0xFF and tile.glyphs.typecode == "B":
+            tile.glyphs = array("I", tile.glyphs)
+        offset = self._offset(x, y)
+        tile.glyphs[offset] = codepoint
+        tile.colors[offset] = colorIndex
+        if self._dirty is not None:
+            self._dirty.add(x, y)
+        self._lines.pop(y, None)
+
+    def fill(self, x0, y0, x1, y1, mark, color=None):
+        self.setMany(
+            ((x, y) for y in range(y0, y1) for x in range(x0, x1)), mark, color
+        )
+
+    def snapshot(self):
+        # Copy-on-write at tile granularity
+        snapshot = copy.copy(self)
+        snapshot._tiles = dict(self._tiles)
+        snapshot._lines = dict(self._lines)
+        snapshot._dirty = None
+        snapshot._shared = set()
+        snapshot._frozen = True
+        self._shared = set(self._tiles)
+        return snapshot
+
+    def _spans(self, y, x0, x1):
+        # (tile, start, end) offsets covering columns [x0, x1) of row y;
+        # tile is None where nothing has been written
+        size = self.tileSize
+        x1 = self.width if x1 is None else min(x1, self.width)
+        rowStart = (y % size) * size
+        x = x0
+        while x < x1:
+            tx = x // size
+            end = min((tx + 1) * size, x1)
+            start = rowStart + x - tx * size
+            yield self._tiles.get((tx, y // size)), start, start + end - x
+            x = end
+
+    def row(self, y, x0=0, x1=None):
+        pieces = []
+        for tile, start, end in self._spans(y, x0, x1):
+            if tile is None:
+                pieces.append(BLANK * (end - start))
+            elif tile.glyphs.typecode == "B":
+                pieces.append(tile.glyphs[start:end].tobytes().decode("latin-1"))
+            else:
+                pieces.append("".join(map(chr, tile.glyphs[start:end])))
+        return "".join(pieces)
+
+    def colors(self, y, x0=0, x1=None):
+        colors = bytearray()
+        for tile, start, end in self._spans(y, x0, x1):
+            colors += tile.colors[start:end] if tile else bytes(end - start)
+        return colors
+
+    def cell(self, x, y):
+        tile = self._tile(x, y)
+        if tile is None:
+            return BLANK, 0
+        offset = self._offset(x, y)
+        return chr(tile.glyphs[offset]), tile.colors[offset]
+
+    def mark(self, x, y):
+        glyph = self.get(x, y)
+        color = self.getColor(x, y)
+        return colored(glyph, color) if color else glyph
+
+    def populated(self):
+        # Only allocated tiles can hold non-blank cells
+        size = self.tileSize
+        for (tx, ty), tile in self._tiles.items():
+            glyphs = tile.glyphs
+            if glyphs.typecode == "B":
+                matches = NON_BLANK.finditer(glyphs.tobytes())
+                offsets = (match.start() for match in matches)
+            else:
+                offsets = (
+                    i for i, code in enumerate(glyphs) if code != BLANK_CODEPOINT
+                )
+            for offset in offsets:
+                yield tx * size + offset % size, ty * size + offset // size
+
+    def toDict(self):
+        size = self.tileSize
+        tiles = []
+        colors = []
+        for (tx, ty), tile in sorted(self._tiles.items()):
+            rows = []
+            for ry in range(min(size, self.height - ty * size)):
+                span = min(size, self.width - tx * size)
+                start = ry * size
+                rows.append("".join(map(chr, tile.glyphs[start : start + span])))
+                colors.extend(
+                    [tx * size + rx, ty * size + ry, PALETTE[index]]
+                    for rx, index in enumerate(tile.colors[start : start + span])
+                    if index
+                )
+            tiles.append([tx, ty, rows])
+        return {"tileSize": size, "tiles": tiles, "colors": colors}
+
+    def load(self, data):
+        if "tiles" not in data:
+            return super().load(data)
+        size = data["tileSize"]
+        for tx, ty, rows in data["tiles"]:
+            for ry, row in enumerate(rows):
+                for rx, glyph in enumerate(row):
+                    if glyph != BLANK:
+                        self.set(tx * size + rx, ty * size + ry, glyph)
+        for x, y, color in data.get("colors", []):
+            self.set(x, y, self.get(x, y), color)
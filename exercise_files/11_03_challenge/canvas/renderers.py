@@ -0,0 +1,314 @@
+from .frame import FrameWriter, CLEAR_SCREEN
+from .dense import denseLines
+from .grid import renderCells
+from .viewport import Viewport
+from collections import deque
+import gzip
+import json
+import math
+import shutil
+import threading
+import time
+
+
+class Renderer:
+    # Canvas.go calls start() before the first tick, frame() after every
+    # tick and stop() once the scribes are done. Renderers read the canvas
+    # through frameLines(), screenColumn() and the grid's dirty cells, so
+    # the same backend works for Canvas, CanvasAxis and SparseCanvas.
+    def start(self, canvas):
+        pass
+
+    def frame(self, canvas):
+        pass
+
+    def stop(self, canvas):
+        pass
+
+
+class NullRenderer(Renderer):
+    # Draws nothing; for batch jobs that only want the final canvas
+    def frame(self, canvas):
+        canvas._canvas.clean()
+
+
+class TerminalRenderer(Renderer):
+    # Redraws the whole frame every tick
+    def __init__(self, writer=None):
+        self.writer = writer if writer is not None else FrameWriter()
+
+    def frame(self, canvas):
+        canvas._canvas.clean()
+        self.writer.frame(canvas.frameLines())
+
+
+class ViewportRenderer(TerminalRenderer):
+    # Redraws only the cells inside a Viewport every tick
+    def __init__(self, viewport, writer=None):
+        super().__init__(writer)
+        self.viewport = viewport
+
+    def frame(self, canvas):
+        canvas._canvas.clean()
+        self.writer.frame(self.viewport.frameLines())
+
+
+class FitRenderer(TerminalRenderer):
+    # Keeps frames inside the terminal. The size is checked every frame, so
+    # resizes take effect on the next one. "clip" shows the part of the
+    # canvas that fits (pan it through self.viewport); "scale" zooms out
+    # until the whole canvas fits. With whenFits, that renderer draws the
+    # frames for as long as the whole canvas fits the terminal.
+    def __init__(self, mode="scale", writer=None, terminalSize=None, whenFits=None):
+        if mode not in ("clip", "scale"):
+            raise ValueError("Unknown fit mode {}".format(mode))
+        super().__init__(writer)
+        self.mode = mode
+        self.terminalSize = terminalSize or shutil.get_terminal_size
+        self.whenFits = whenFits
+        self.viewport = None
+        self._size = None
+        self._fitting = False
+
+    def start(self, canvas):
+        self._fitting = False
+
+    def stop(self, canvas):
+        if self.whenFits is not None and self._fitting:
+            self.whenFits.stop(canvas)
+
+    def fit(self, canvas, size=None):
+        columns, lines = size or self.terminalSize()
+        if self.viewport is None:
+            self.viewport = Viewport(canvas, 1, 1)
+        self.viewport.canvas = canvas
+        if (columns, lines) == self._size:
+            return
+        self._size = (columns, lines)
+        # The last line holds the cursor; gutters and axes take the rest of
+        # what the canvas needs around its cells
+        width = max((columns + 1) // 2, 1)
+        height = max(lines - 1, 1)
+        while width > 1 and canvas.viewportScreenSize(width, height)[0] > columns:
+            width -= 1
+        while height > 1 and canvas.viewportScreenSize(width, height)[1] > lines - 1:
+            height -= 1
+        self.viewport.resize(width, height)
+        if self.mode == "scale":
+            grid = canvas._canvas
+            self.viewport.setZoom(
+                max(math.ceil(grid.width / width), math.ceil(grid.height / height), 1)
+            )
+
+    def frame(self, canvas):
+        size = self.terminalSize()
+        if self.whenFits is not None and canvas.fitsTerminal(size):
+            if not self._fitting:
+                # Starts over, as the screen holds a fitted frame
+                self.whenFits.start(canvas)
+                self._fitting = True
+            self.whenFits.frame(canvas)
+            return
+        self._fitting = False
+        canvas._canvas.clean()
+        self.fit(canvas, size)
+        self.writer.frame(canvas.viewportLines(self.viewport))
+
+
+class DenseRenderer(TerminalRenderer):
+    # Packs cells into Braille (2x4 cells per character) or half-block (1x2)
+    # glyphs, so a 400x200 canvas fits in 200x50 or 400x100 characters
+    def __init__(self, mode="braille", writer=None):
+        super().__init__(writer)
+        self.mode = mode
+
+    def frame(self, canvas):
+        canvas._canvas.clean()
+        self.writer.frame(denseLines(canvas._canvas, self.mode))
+
+
+class DiffRenderer(TerminalRenderer):
+    # Draws the first frame in full, then only rewrites the cells that
+    # changed, moving the cursor to each one. Above fullRedraw (a share of
+    # all cells) a full frame is cheaper than the cursor moves.
+    fullRedraw = 0.5
+
+    def start(self, canvas):
+        self._drawn = False
+
+    def frame(self, canvas):
+        if not getattr(self, "_drawn", False):
+            super().frame(canvas)
+            self._drawn = True
+            return
+        self.writeChanges(canvas)
+
+    def writeChanges(self, canvas):
+        grid = canvas._canvas
+        if grid.dirtyCount() > self.fullRedraw * grid.width * grid.height:
+            super().frame(canvas)
+            return
+        changes = grid.takeDirtySpans()
+        if not changes:
+            return
+        # Each changed span of a row is written after a single cursor move,
+        # with color escapes only where the color changes
+        output = [
+            "\x1b[{};{}H".format(y + 1, canvas.screenColumn(x0))
+            + renderCells([grid.cell(x, y) for x in range(x0, x1)])
+            for y, x0, x1 in changes
+        ]
+        output.append("\x1b[{};1H".format(canvas.screenHeight() + 1))
+        self.writer.write("".join(output))
+
+
+class TextFileRenderer(Renderer):
+    # Writes frames as plain text (no escape codes). By default only the
+    # final frame is kept; with everyFrame=True each frame is appended,
+    # separated by a form feed.
+    def __init__(self, path, everyFrame=False):
+        self.path = path
+        self.everyFrame = everyFrame
+
+    def start(self, canvas):
+        self._file = open(self.path, "w")
+
+    def frame(self, canvas):
+        canvas._canvas.clean()
+        if self.everyFrame:
+            self._file.write("\n".join(canvas.frameLines(plain=True)) + "\n\f\n")
+
+    def stop(self, canvas):
+        if not self.everyFrame:
+            self._file.write("\n".join(canvas.frameLines(plain=True)) + "\n")
+        self._file.close()
+
+
+class AsciicastWriter:
+    # FrameWriter stand-in that turns each write into an asciicast v2
+    # output event stamped with the simulation time
+    def __init__(self, file):
+        self.file = file
+        self.time = 0
+
+    def write(self, text):
+        event = [round(self.time, 6), "o", text.replace("\n", "\r\n")]
+        self.file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def clear(self):
+        self.write(CLEAR_SCREEN)
+
+    def frame(self, lines):
+        self.write(CLEAR_SCREEN + "\n".join(lines) + "\n")
+
+
+class AsciicastRenderer(DiffRenderer):
+    # Records a run as an asciinema v2 .cast file: one full frame, then only
+    # the changed cells. Event times come from the simulation clock
+    # (canvas.tick * tickInterval), so recording works at full headless
+    # speed with Canvas.run. Paths ending in .gz are gzip-compressed.
+    def __init__(self, path, tickInterval=None, title=None):
+        self.path = path
+        self.tickInterval = tickInterval
+        self.title = title
+
+    def start(self, canvas):
+        super().start(canvas)
+        opener = gzip.open if self.path.endswith(".gz") else open
+        self._file = opener(self.path, "wt")
+        lines = canvas.frameLines(plain=True)
+        header = {
+            "version": 2,
+            "width": max([len(line) for line in lines], default=0),
+            "height": canvas.screenHeight() + 1,
+            "timestamp": int(time.time()),
+        }
+        if self.title:
+            header["title"] = self.title
+        self._file.write(json.dumps(header) + "\n")
+        self.writer = AsciicastWriter(self._file)
+        self._interval = (
+            canvas.framerate if self.tickInterval is None else self.tickInterval
+        )
+
+    def frame(self, canvas):
+        self.writer.time = canvas.tick * self._interval
+        super().frame(canvas)
+
+    def stop(self, canvas):
+        self._file.close()
+
+
+class ThreadedRenderer(Renderer):
+    # Runs another renderer on a dedicated writer thread. Each tick the
+    # simulation thread only takes a copy-on-write snapshot and queues it,
+    # so it never waits on stdout. When more than maxFrames are waiting,
+    # the policy decides what to do:
+    #   "drop": drop the oldest waiting frame
+    #   "coalesce": replace every waiting frame with the newest one
+    # Cells changed in dropped frames are merged into the next frame kept,
+    # so diff-based renderers stay correct. An error raised by the wrapped
+    # renderer stops the writer and is raised again from the next frame()
+    # or from stop().
+    def __init__(self, renderer, maxFrames=2, policy="drop"):
+        if policy not in ("drop", "coalesce"):
+            raise ValueError("Unknown policy {}".format(policy))
+        self.renderer = renderer
+        self.maxFrames = maxFrames
+        self.policy = policy
+        self.dropped = 0
+
+    def start(self, canvas):
+        self._frames = deque()
+        self._ready = threading.Condition()
+        self._stopping = False
+        self._error = None
+        self.renderer.start(canvas)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def frame(self, canvas):
+        self._raiseError()
+        snapshot = canvas.snapshot()
+        snapshot._canvas.swapDirty(canvas._canvas.swapDirty())
+        with self._ready:
+            while self._frames and (
+                self.policy == "coalesce" or len(self._frames) >= self.maxFrames
+            ):
+                stale = self._frames.popleft()
+                snapshot._canvas._dirty.update(stale._canvas._dirty)
+                self.dropped += 1
+            self._frames.append(snapshot)
+            self._ready.notify()
+
+    def _write(self):
+        while True:
+            with self._ready:
+                while not self._frames and not self._stopping:
+                    self._ready.wait()
+                if not self._frames:
+                    return
+                snapshot = self._frames.popleft()
+            try:
+                self.renderer.frame(snapshot)
+            except Exception as error:
+                with self._ready:
+                    self._error = error
+                    self._frames.clear()
+                return
+
+    def _raiseError(self):
+        # Raises the writer's error once, in the simulation thread
+        with self._ready:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def stop(self, canvas):
+        # Lets the writer finish the queued frames before stopping
+        with self._ready:
+            self._stopping = True
+            self._ready.notify()
+        self._thread.join()
+        self.renderer.stop(canvas)
+        self._raiseError()
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+
+class FixedTimestep:
+    # Advances the simulation on a fixed tick schedule and renders on a
+    # separate (usually slower) frame schedule. Sleeping is measured against
+    # the schedule rather than after each tick, so render time does not
+    # stretch the tick period. When a render makes the display fall behind,
+    # the frames it missed are dropped instead of being drawn late.
+    def __init__(self, tickInterval, frameInterval=None, clock=None, sleep=None):
+        self.tickInterval = tickInterval
+        self.frameInterval = tickInterval if frameInterval is None else frameInterval
+        self.clock = clock or time.perf_counter
+        self.sleep = sleep or time.sleep
+        self.ticks = 0
+        self.frames = 0
+        self.droppedFrames = 0
+        self.elapsed = 0
+
+    def run(self, ticks, render):
+        # ticks is an iterator that runs one simulation tick per step
+        self._begin()
+        for _ in ticks:
+            delay = self._step(render)
+            if delay > 0:
+                self.sleep(delay)
+        return self._finish(render)
+
+    async def runAsync(self, ticks, render, sleep=None):
+        # run() for an async iterator of ticks. Waiting is done with
+        # asyncio.sleep (or the given coroutine function), so other tasks
+        # on the event loop keep running between ticks.
+        sleep = sleep or asyncio.sleep
+        self._begin()
+        async for _ in ticks:
+            delay = self._step(render)
+            # Always yield to the loop, even when behind schedule
+            await sleep(max(delay, 0))
+        return self._finish(render)
+
+    def _begin(self):
+        self.start = now = self.clock()
+        self.nextTick = self.nextFrame = now
+        self.rendered = False
+
+    def _step(self, render):
+        # Counts one finished tick, renders if a frame is due and returns
+        # how long to wait before the next tick
+        self.ticks += 1
+        self.nextTick += self.tickInterval
+        now = self.clock()
+        self.rendered = False
+        if now >= self.nextFrame:
+            render()
+            self.frames += 1
+            self.rendered = True
+            now = self.clock()
+            self.nextFrame += self.frameInterval
+            if self.frameInterval and now > self.nextFrame:
+                missed = int((now - self.nextFrame) / self.frameInterval) + 1
+                self.droppedFrames += missed
+                self.nextFrame += missed * self.frameInterval
+        return self.nextTick - now
+
+    def _finish(self, render):
+        if self.ticks and not self.rendered:
+            # Always show the final state
+            render()
+            self.frames += 1
+        self.elapsed = self.clock() - self.start
+        return self.stats()
+
+    def achievedTickRate(self):
+        return self.ticks / self.elapsed if self.elapsed else 0
+
+    def achievedFrameRate(self):
+        return self.frames / self.elapsed if self.elapsed else 0
+
+    def overBudget(self):
+        # True when the simulation could not keep up with its tick schedule
+        if not self.tickInterval or not self.elapsed:
+            return False
+        return self.elapsed > self.ticks * self.tickInterval * 1.05
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "droppedFrames": self.droppedFrames,
+            "elapsed": self.elapsed,
+            "tickRate": self.achievedTickRate(),
+            "frameRate": self.achievedFrameRate(),
+            "overBudget": self.overBudget(),
+        }
@@ -0,0 +1,241 @@
+import os
+import queue
+import time
+from multiprocessing import get_all_start_methods, get_context, shared_memory
+from threading import BrokenBarrierError
+
+from .exceptions import TerminalScribeException
+from .grid import PALETTE, DirtySpans, SparseGrid, encodeMark
+
+
+class SharedGrid:
+    # The cells scribes draw during a sharded run, in one shared memory
+    # block so every worker process writes to the same grid. Each cell keeps
+    # a glyph, a palette index and the stamp of the write that set it.
+    def __init__(self, width, height, context, stripes=64):
+        self.width = width
+        self.height = height
+        cells = width * height
+        self.memory = shared_memory.SharedMemory(create=True, size=max(cells * 13, 1))
+        buffer = self.memory.buf
+        self.stamps = buffer[: cells * 8].cast("Q")
+        self.glyphs = buffer[cells * 8 : cells * 12].cast("I")
+        self.colors = buffer[cells * 12 : cells * 13]
+        self.locks = [context.Lock() for _ in range(max(min(height, stripes), 1))]
+
+    def write(self, x, y, codepoint, colorIndex, stamp):
+        # Stamps grow with (tick, scribe index), so the write that lands last
+        # in a serial run wins however the processes interleave
+        cell = y * self.width + x
+        with self.locks[y % len(self.locks)]:
+            if stamp >= self.stamps[cell]:
+                self.stamps[cell] = stamp
+                self.glyphs[cell] = codepoint
+                self.colors[cell] = colorIndex
+
+    def written(self, spans):
+        # (x, y, mark, color) for every cell a scribe drew, looking only at
+        # the DirtySpans the workers reported writing to
+        for y, x0, x1 in spans.rows():
+            for x in range(x0, x1):
+                cell = y * self.width + x
+                if self.stamps[cell]:
+                    mark = chr(self.glyphs[cell])
+                    yield x, y, mark, PALETTE[self.colors[cell]]
+
+    def close(self):
+        for view in (self.stamps, self.glyphs, self.colors):
+            view.release()
+        self.memory.close()
+        self.memory.unlink()
+
+
+class ShardWriter:
+    # Stands in for the canvas while a worker runs a scribe's move, like a
+    # TickBuffer: reads go to the worker's copy of the canvas and writes go
+    # to the shared grid with the stamp of the current (tick, scribe). The
+    # cells written are remembered so the parent only copies those back.
+    def __init__(self, canvas, grid):
+        self._target = canvas
+        self._grid = grid
+        self.stamp = 0
+        self.written = DirtySpans()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def _checkLayer(self, layer):
+        if self._target._target(layer) is not self._target._target(None):
+            raise TerminalScribeException("Sharded runs only draw on the scribe layer")
+
+    def _write(self, x, y, mark, color):
+        if not (0 <= x < self._grid.width and 0 <= y < self._grid.height):
+            raise TerminalScribeException(
+                "Position ({}, {}) is outside the {}x{} grid".format(
+                    x, y, self._grid.width, self._grid.height
+                )
+            )
+        try:
+            codepoint, colorIndex = encodeMark(mark, color)
+        except ValueError as e:
+            raise TerminalScribeException(str(e))
+        self._grid.write(x, y, codepoint, colorIndex, self.stamp)
+        self.written.add(x, y)
+
+    def setPos(self, pos, mark, color=None, layer=None):
+        self._checkLayer(layer)
+        self._write(round(pos[0]), round(pos[1]), mark, color)
+
+    def setMany(self, points, mark, color=None, layer=None):
+        self._checkLayer(layer)
+        outside = []
+        for point in points:
+            x, y = round(point[0]), round(point[1])
+            if 0 <= x < self._grid.width and 0 <= y < self._grid.height:
+                self._write(x, y, mark, color)
+            else:
+                outside.append(point)
+        return outside
+
+    def fill(self, topLeft, bottomRight, mark, color=None, layer=None):
+        self._checkLayer(layer)
+        x0 = max(round(topLeft[0]), 0)
+        y0 = max(round(topLeft[1]), 0)
+        x1 = min(round(bottomRight[0]) + 1, self._grid.width)
+        y1 = min(round(bottomRight[1]) + 1, self._grid.height)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                self._write(x, y, mark, color)
+
+
+def scribeState(scribe):
+    # Everything a worker changed on a scribe, to copy back to the parent
+    return {key: value for key, value in vars(scribe).items() if key != "moves"}
+
+
+def runShard(canvas, grid, shard, worker, workers, barrier, alive, results):
+    # Runs the moves of the (index, scribe) pairs in shard, one tick per
+    # barrier. alive has two rows of flags, one per worker, used on
+    # alternate ticks so a row is never rewritten while others still read it.
+    writer = ShardWriter(canvas, grid)
+    streams = [(index, scribe.steps()) for index, scribe in shard]
+    count = len(canvas.scribes)
+    tick = 0
+    try:
+        while True:
+            moved = False
+            for index, moves in streams:
+                step = next(moves, None)
+                if step is None:
+                    continue
+                move, args = step
+                writer.stamp = tick * count + index + 1
+                move(*args, writer)
+                moved = True
+            row = (tick % 2) * workers
+            alive[row + worker] = moved
+            barrier.wait()
+            if not any(alive[row : row + workers]):
+                break
+            tick += 1
+    except BrokenBarrierError:
+        # Another worker failed and reports the error
+        results.put((worker, None))
+        return
+    except Exception as error:
+        barrier.abort()
+        results.put((worker, error))
+        return
+    states = [scribeState(scribe) for _, scribe in shard]
+    results.put((worker, (tick, states, writer.written)))
+
+
+def runShards(canvas, processes=None):
+    # Splits the scribes of a canvas across worker processes that draw into
+    # a SharedGrid, then copies what they drew onto the canvas. Scribes are
+    # dealt round-robin, so scribe i runs in worker i % processes. The shared
+    # grid takes 13 bytes per cell of the whole canvas, so sparse canvases
+    # are refused rather than allocated densely.
+    if "fork" not in get_all_start_methods():
+        raise TerminalScribeException("Sharded runs need the fork start method")
+    if isinstance(canvas._canvas, SparseGrid):
+        raise TerminalScribeException(
+            "Sharded runs need a dense Canvas; a SparseCanvas is too large to share"
+        )
+    context = get_context("fork")
+    scribes = canvas.scribes
+    processes = min(processes or os.cpu_count() or 1, len(scribes))
+    start = time.perf_counter()
+    if not processes:
+        return {"ticks": 0, "processes": 0, "elapsed": 0}
+    grid = SharedGrid(canvas._canvas.width, canvas._canvas.height, context)
+    barrier = context.Barrier(processes)
+    alive = context.RawArray("b", 2 * processes)
+    results = context.Queue()
+    shards = [
+        [(index, scribes[index]) for index in range(worker, len(scribes), processes)]
+        for worker in range(processes)
+    ]
+    workers = [
+        context.Process(
+            target=runShard,
+            args=(canvas, grid, shard, worker, processes, barrier, alive, results),
+            daemon=True,
+        )
+        for worker, shard in enumerate(shards)
+    ]
+    try:
+        for process in workers:
+            process.start()
+        outcomes = {}
+        while len(outcomes) < processes:
+            try:
+                worker, outcome = results.get(timeout=0.1)
+            except queue.Empty:
+                # A worker that died without reporting (crash, kill) leaves
+                # the others waiting at the barrier, so release them
+                for worker, process in enumerate(workers):
+                    if worker not in outcomes and process.exitcode not in (None, 0):
+                        barrier.abort()
+                        raise TerminalScribeException(
+                            "Worker process {} exited with code {}".format(
+                                worker, process.exitcode
+                            )
+                        )
+                running = any(process.is_alive() for process in workers)
+                if not running and results.empty():
+                    raise TerminalScribeException("A worker process exited early")
+                continue
+            outcomes[worker] = outcome
+        for process in workers:
+            process.join()
+        for outcome in outcomes.values():
+            if isinstance(outcome, BaseException):
+                raise outcome
+        if None in outcomes.values():
+            raise TerminalScribeException("A worker process failed")
+
+        ticks = 0
+        written = DirtySpans()
+        for worker, (workerTicks, states, cells) in outcomes.items():
+            ticks = workerTicks
+            written.update(cells)
+            for (index, scribe), state in zip(shards[worker], states):
+                vars(scribe).update(state)
+                # The worker used up the program
+                scribe.moves.clear()
+        for x, y, mark, color in grid.written(written):
+            canvas.setPos([x, y], mark, color)
+        canvas.tick += ticks
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+            if process.pid is not None:
+                process.join()
+        grid.close()
+    return {
+        "ticks": ticks,
+        "processes": processes,
+        "elapsed": time.perf_counter() - start,
+    }
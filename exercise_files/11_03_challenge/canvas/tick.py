@@ -0,0 +1,30 @@
+class TickBuffer:
+    # Stands in for the canvas while one scribe runs its move for a tick on
+    # an executor. Reads (walls, reflections, size) go to the real canvas;
+    # writes are recorded and only applied by apply() at the tick barrier.
+    # Applying the buffers in scribe order gives the same canvas as running
+    # the moves one after another, however the threads were scheduled.
+    def __init__(self, canvas):
+        self._target = canvas
+        self.writes = []
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def setPos(self, pos, mark, color=None, layer=None):
+        self.writes.append((self._target.setPos, (list(pos), mark, color, layer)))
+
+    def setMany(self, points, mark, color=None, layer=None):
+        points = list(points)
+        self.writes.append((self._target.setMany, (points, mark, color, layer)))
+        return [point for point in points if self._target.hitsWall(point)]
+
+    def fill(self, topLeft, bottomRight, mark, color=None, layer=None):
+        self.writes.append(
+            (self._target.fill, (list(topLeft), list(bottomRight), mark, color, layer))
+        )
+
+    def apply(self):
+        for method, args in self.writes:
+            method(*args)
+        self.writes = []
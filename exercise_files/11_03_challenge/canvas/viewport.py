@@ -0,0 +1,109 @@
+from .exceptions import InvalidParameter
+from .grid import BLANK, renderCells
+from utils.validation import is_number
+
+# Zoomed-out cells with no colored mark show how full their block is
+DENSITY = " .:-=+*#%@"
+
+
+class Viewport:
+    # A window of width x height output cells onto a canvas. At zoom n each
+    # output cell covers an n x n block of canvas cells. Rendering only
+    # reads the cells under the window, so its cost follows the viewport
+    # size rather than the canvas size.
+    def __init__(self, canvas, width, height, x=0, y=0, zoom=1):
+        for name, value in [("Width", width), ("Height", height), ("Zoom", zoom)]:
+            if not is_number(value) or int(value) < 1:
+                raise InvalidParameter("{} must be a positive number".format(name))
+        self.canvas = canvas
+        self.width = int(width)
+        self.height = int(height)
+        self.zoom = int(zoom)
+        self.moveTo(x, y)
+
+    def resize(self, width, height):
+        if not is_number(width) or not is_number(height):
+            raise InvalidParameter("Viewport size must be numeric")
+        self.width = max(int(width), 1)
+        self.height = max(int(height), 1)
+        self.moveTo(self.x, self.y)
+
+    def moveTo(self, x, y):
+        # Keeps the window inside the canvas where possible
+        grid = self.canvas._canvas
+        maxX = max(grid.width - self.width * self.zoom, 0)
+        maxY = max(grid.height - self.height * self.zoom, 0)
+        self.x = min(max(int(x), 0), maxX)
+        self.y = min(max(int(y), 0), maxY)
+
+    def pan(self, dx, dy):
+        self.moveTo(self.x + dx * self.zoom, self.y + dy * self.zoom)
+
+    def center(self):
+        return (
+            self.x + self.width * self.zoom // 2,
+            self.y + self.height * self.zoom // 2,
+        )
+
+    def centerOn(self, x, y):
+        self.moveTo(x - self.width * self.zoom // 2, y - self.height * self.zoom // 2)
+
+    def setZoom(self, zoom):
+        if not is_number(zoom) or int(zoom) < 1:
+            raise InvalidParameter("Zoom must be a positive number")
+        x, y = self.center()
+        self.zoom = int(zoom)
+        self.centerOn(x, y)
+
+    def zoomIn(self):
+        self.setZoom(max(self.zoom // 2, 1))
+
+    def zoomOut(self):
+        self.setZoom(self.zoom * 2)
+
+    def rows(self):
+        # Canvas y where each output line starts
+        end = min(self.y + self.height * self.zoom, self.canvas._canvas.height)
+        return range(self.y, end, self.zoom)
+
+    def columns(self):
+        # Canvas x where each output cell starts
+        end = min(self.x + self.width * self.zoom, self.canvas._canvas.width)
+        return range(self.x, end, self.zoom)
+
+    def frameLines(self, plain=False):
+        grid = self.canvas._canvas
+        zoom = self.zoom
+        x0 = self.x
+        x1 = min(x0 + self.width * zoom, grid.width)
+        lines = []
+        for y in self.rows():
+            rows = range(y, min(y + zoom, grid.height))
+            glyphs = [grid.row(row, x0, x1) for row in rows]
+            colors = [grid.colors(row, x0, x1) for row in rows]
+            if zoom == 1:
+                cells = zip(glyphs[0], colors[0])
+            else:
+                cells = [
+                    self._aggregate(glyphs, colors, i, i + zoom)
+                    for i in range(0, x1 - x0, zoom)
+                ]
+            if plain:
+                cells = [(glyph, 0) for glyph, color in cells]
+            lines.append(renderCells(cells))
+        return lines
+
+    def _aggregate(self, glyphs, colors, start, end):
+        # A colored mark (a scribe's head) wins; otherwise show the density
+        # of marks in the block
+        filled = 0
+        for rowGlyphs, rowColors in zip(glyphs, colors):
+            for i in range(start, min(end, len(rowGlyphs))):
+                if rowColors[i]:
+                    return rowGlyphs[i], rowColors[i]
+                if rowGlyphs[i] != BLANK:
+                    filled += 1
+        if not filled:
+            return BLANK, 0
+        cells = self.zoom * self.zoom
+        return DENSITY[max(1, filled * (len(DENSITY) - 1) // cells)], 0
@@ -1,13 +1,18 @@
 from canvas.exceptions import InvalidParameter
-from termcolor import colored, COLORS
+from termcolor import COLORS
 from utils.validation import is_number
 import math
+from collections import deque
 from inspect import getmembers, ismethod
 
 
 class TerminalScribe:
     def __init__(self, color="red", mark="*", trail=".", pos=(0, 0), degrees=135):
-        self.moves = []
+        # The program still to run, consumed from the front by steps(). An
+        # entry is one move (method, args), a run of moves ([(method, args),
+        # ...], count) repeated count times (None: forever), or an iterator
+        # producing (method, args) steps, e.g. a generator.
+        self.moves = deque()
 
         if color not in COLORS:
             raise InvalidParameter(
@@ -38,12 +43,14 @@ class TerminalScribe:
             "mark": self.mark,
             "trail": self.trail,
             "pos": self.pos,
-            "moves": [[move[0].__name__, move[1]] for move in self.moves],
+            "moves": self._movesToDict(),
         }
 
     @staticmethod
     def fromDict(data):
-        scribe = globals()[data.get("classname")](
+        import scribes as scribe_classes
+
+        scribe = getattr(scribe_classes, data.get("classname"))(
             color=data.get("color"),
             mark=data.get("mark"),
             trail=data.get("trail"),
@@ -52,9 +59,73 @@ class TerminalScribe:
         scribe.moves = scribe._movesFromDict(data.get("moves"))
         return scribe
 
+    def _movesToDict(self):
+        data = []
+        for entry in self.moves:
+            if isinstance(entry, tuple) and callable(entry[0]):
+                data.append([entry[0].__name__, entry[1]])
+            elif isinstance(entry, tuple):
+                moves, count = entry
+                data.append([[[move.__name__, args] for move, args in moves], count])
+            else:
+                raise InvalidParameter("Generated moves cannot be serialized")
+        return data
+
     def _movesFromDict(self, movesData):
+        # Older files list every move as [name, args]
         bound_methods = {key: val for key, val in getmembers(self, predicate=ismethod)}
-        return [[bound_methods[name], args] for name, args in movesData]
+        moves = deque()
+        for entry in movesData:
+            if isinstance(entry[0], str):
+                moves.append((bound_methods[entry[0]], entry[1]))
+            else:
+                steps = [(bound_methods[name], args) for name, args in entry[0]]
+                moves.append(self._repeatEntry(steps, entry[1]))
+        return moves
+
+    def steps(self):
+        # Yields the program one (method, args) step at a time, dropping
+        # each entry from moves once it is used up. Each pass of a repeated
+        # run is counted off its entry and queued in front of it as single
+        # moves, so moves always holds exactly what is left to run.
+        moves = self.moves
+        while moves:
+            entry = moves[0]
+            if isinstance(entry, tuple) and callable(entry[0]):
+                moves.popleft()
+                yield entry
+            elif isinstance(entry, tuple):
+                steps, count = entry
+                if not steps:
+                    # Nothing to repeat; dropped so a forever run cannot spin
+                    moves.popleft()
+                    continue
+                if count is not None and count <= 1:
+                    moves.popleft()
+                    if count < 1:
+                        continue
+                elif count is not None:
+                    moves[0] = (steps, count - 1)
+                moves.extendleft(reversed(steps))
+            else:
+                step = next(entry, None)
+                if step is None:
+                    moves.popleft()
+                else:
+                    yield step
+
+    def _repeatEntry(self, steps, count):
+        steps = [tuple(step) for step in steps]
+        if not steps:
+            raise InvalidParameter("A repeated run needs at least one move")
+        whole = isinstance(count, int) and not isinstance(count, bool)
+        if count is not None and not whole:
+            raise InvalidParameter("Repeat count must be a whole number or None")
+        return (steps, count)
+
+    def repeat(self, steps, count=None):
+        # Queues a run of (method, args) steps count times, or forever
+        self.moves.append(self._repeatEntry(steps, count))
 
     def _setPosition(self, pos, _):
         self.pos = pos
@@ -93,10 +164,10 @@ class TerminalScribe:
         self.draw(pos, canvas)
 
     def forward(self, distance=1):
-        for i in range(distance):
-            self.moves.append((self._forward, []))
+        # distance=None keeps going forever
+        self.repeat([(self._forward, [])], distance)
 
     def draw(self, pos, canvas):
         canvas.setPos(self.pos, self.trail)
         self.pos = pos
-        canvas.setPos(self.pos, colored(self.mark, self.color))
+        canvas.setPos(self.pos, self.mark, self.color)
@@ -16,7 +16,9 @@ class PlotScribe(TerminalScribe):
 
     @staticmethod
     def fromDict(data):
-        scribe = globals()[data.get("classname")](
+        import scribes as scribe_classes
+
+        scribe = getattr(scribe_classes, data.get("classname"))(
             color=data.get("color"),
             mark=data.get("mark"),
             trail=data.get("trail"),
@@ -34,5 +36,4 @@ class PlotScribe(TerminalScribe):
 
     def plotX(self, function):
         self.x = self.domain[0]
-        for x in range(self.domain[0], self.domain[1]):
-            self.moves.append((self._plotX, [function]))
+        self.repeat([(self._plotX, [function])], self.domain[1] - self.domain[0])
@@ -6,11 +6,13 @@ class RandomWalkScribe(TerminalScribe):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.degrees = kwargs.get("degrees", 135)
+        # A generator of its own, seeded from the module one, so the walk is
+        # the same whichever thread or process runs the moves
+        self.random = random.Random(random.getrandbits(64))
 
     def _randomizeDegrees(self, _):
-        self.degrees = random.randint(self.degrees - 10, self.degrees + 10)
+        self.degrees = self.random.randint(self.degrees - 10, self.degrees + 10)
         self.direction = self.degreesToUnitDirection(self.degrees)
-        print(f"Degrees is {self.degrees}")
 
     def randomizeDegrees(self):
         self.moves.append((self._randomizeDegrees, []))
@@ -27,6 +29,4 @@ class RandomWalkScribe(TerminalScribe):
         ]
 
     def forward(self, distance=1):
-        for i in range(distance):
-            self.randomizeDegrees()
-            super().forward()
+        self.repeat([(self._randomizeDegrees, []), (self._forward, [])], distance)
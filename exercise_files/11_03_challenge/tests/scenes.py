@@ -0,0 +1,14 @@
+from canvas.base import Canvas
+from scribes.robot import RobotScribe
+
+
+def crossingScene(scribeClass=RobotScribe, leftClass=None, executor=None):
+    # On their last tick the red head and the blue trail land on (5, 2), so
+    # a run only matches a serial one if writes are applied in scribe order
+    left = (leftClass or scribeClass)(color="red", pos=(0, 2))
+    left.right(5)
+    right = scribeClass(color="blue", pos=(9, 2))
+    right.left(5)
+    down = scribeClass(color="green", pos=(4, 0))
+    down.down(4)
+    return Canvas(10, 5, scribes=[left, right, down], framerate=0, executor=executor)
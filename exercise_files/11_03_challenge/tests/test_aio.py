@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from canvas.base import Canvas
+from canvas.renderers import NullRenderer
+from scribes.robot import RobotScribe
+from tests.scenes import crossingScene
+
+
+class TestGoAsync(unittest.TestCase):
+    def test_matches_serial_run(self):
+        serial = crossingScene()
+        serial.run()
+        concurrent = crossingScene()
+        stats = asyncio.run(concurrent.goAsync(NullRenderer()))
+        self.assertEqual(stats["ticks"], serial.tick)
+        self.assertEqual(concurrent.tick, serial.tick)
+        for y in range(5):
+            self.assertEqual(concurrent._canvas.row(y), serial._canvas.row(y))
+            self.assertEqual(concurrent._canvas.colors(y), serial._canvas.colors(y))
+
+    def test_shares_the_event_loop(self):
+        beats = []
+
+        async def heartbeat():
+            while True:
+                beats.append(1)
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.ensure_future(heartbeat())
+            try:
+                return await crossingScene().goAsync(NullRenderer())
+            finally:
+                task.cancel()
+
+        stats = asyncio.run(main())
+        self.assertEqual(stats["ticks"], 7)
+        self.assertGreaterEqual(len(beats), 7)
+
+    def test_move_errors_propagate(self):
+        scribe = RobotScribe()
+        scribe.moves.append((lambda canvas: 1 / 0, []))
+        canvas = Canvas(5, 5, scribes=[scribe], framerate=0)
+        with self.assertRaises(ZeroDivisionError):
+            asyncio.run(canvas.goAsync(NullRenderer()))
+
+    def test_generated_move_errors_propagate(self):
+        scribe = RobotScribe()
+
+        def failing():
+            yield scribe._setDirection, [[1, 0]]
+            raise ValueError("broken program")
+
+        scribe.moves.append(failing())
+        canvas = Canvas(5, 5, scribes=[scribe], framerate=0)
+
+        async def main():
+            return await asyncio.wait_for(canvas.goAsync(NullRenderer()), 5)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(main())
@@ -1,6 +1,14 @@
 import unittest
-from canvas.base import Canvas
+import io
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from unittest import mock
+from termcolor import COLORS
+from canvas.base import Canvas, CanvasAxis, SparseCanvas
 from scribes.base import TerminalScribe
+from scribes.random_walk import RandomWalkScribe
+from scribes.robot import RobotScribe
 
 
 class TestCanvas(unittest.TestCase):
@@ -17,3 +25,172 @@ class TestCanvas(unittest.TestCase):
         scribe.forward(1)
         canvas.scribes.append(scribe)
         canvas.go()
+
+    def test_set_pos_keeps_marks(self):
+        canvas = Canvas(10, 10)
+        canvas.setPos([2, 3], ".")
+        canvas.setPos([4.4, 5.6], "*", "green")
+        self.assertEqual(canvas._canvas.get(2, 3), ".")
+        self.assertEqual(canvas._canvas.get(4, 6), "*")
+        self.assertEqual(canvas._canvas.getColor(4, 6), "green")
+        self.assertIsNone(canvas._canvas.getColor(2, 3))
+
+        data = canvas.toDict()
+        self.assertEqual(data["colors"], [[4, 6, "green"]])
+        loaded = Canvas.fromDict(data)
+        self.assertEqual(loaded.toDict(), data)
+
+    def test_load_legacy_colored_cells(self):
+        columns = [[" " for y in range(5)] for x in range(5)]
+        columns[1][2] = "\x1b[33m*\x1b[0m"
+        columns[3][4] = "."
+        canvas = Canvas.fromDict(
+            {"classname": "Canvas", "x": 5, "y": 5, "canvas": columns, "scribes": []}
+        )
+        self.assertEqual(canvas._canvas.get(1, 2), "*")
+        self.assertEqual(canvas._canvas.getColor(1, 2), "yellow")
+        self.assertEqual(canvas._canvas.row(4), "   . ")
+
+    def test_large_canvas_is_compact(self):
+        tracemalloc.start()
+        canvas = Canvas(4000, 4000)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(size, 40 * 1024 * 1024)
+        canvas.setPos([3999, 3999], "█")
+        self.assertEqual(canvas._canvas.get(3999, 3999), "█")
+
+    def test_dirty_tracking_of_large_fill_is_compact(self):
+        canvas = Canvas(2000, 2000)
+        tracemalloc.start()
+        canvas.fill([0, 0], [1999, 1999], "#", "red")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 2 * 1024 * 1024)
+        self.assertEqual(canvas._canvas.dirtyCount(), 2000 * 2000)
+
+        # Changing most of the canvas falls back to one full frame
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.printChanges()
+        self.assertTrue(output.getvalue().startswith("\x1b[H\x1b[2J"))
+        self.assertEqual(canvas._canvas.dirtyCount(), 0)
+
+    def test_print_changes_writes_only_dirty_cells(self):
+        canvas = Canvas(200, 60)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.print()
+            canvas.setPos([3, 1], ".")
+            canvas.setPos([4, 1], "*")
+            canvas.setPos([0, 5], "*")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.printChanges()
+        self.assertEqual(output.getvalue(), "\x1b[2;7H. *\x1b[6;1H*\x1b[61;1H")
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.printChanges()
+        self.assertEqual(output.getvalue(), "")
+
+    def test_print_changes_skips_axis_gutter(self):
+        canvas = CanvasAxis(10, 10)
+        canvas.setPos([0, 0], "*")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.printChanges()
+        self.assertEqual(output.getvalue(), "\x1b[1;3H*\x1b[12;1H")
+
+    def test_row_cache_invalidated_by_set_pos(self):
+        canvas = Canvas(5, 3)
+        first = canvas.frameLines()
+        self.assertIs(canvas.frameLines()[1], first[1])
+
+        canvas.setPos([2, 1], "*")
+        second = canvas.frameLines()
+        self.assertEqual(second[1], "    *    ")
+        self.assertIs(second[0], first[0])
+        self.assertIs(second[2], first[2])
+
+    def test_set_many_reports_points_outside(self):
+        canvas = Canvas(10, 10)
+        outside = canvas.setMany([[1, 1], [2.4, 2.6], [-1, 3], [4, 10]], "o", "red")
+        self.assertEqual(outside, [[-1, 3], [4, 10]])
+        self.assertEqual(canvas._canvas.get(2, 3), "o")
+        self.assertEqual(canvas._canvas.getColor(1, 1), "red")
+        self.assertEqual(canvas._canvas.takeDirty(), [(1, 1), (2, 3)])
+
+    def test_fill_is_clipped(self):
+        for canvasClass in [Canvas, SparseCanvas]:
+            canvas = canvasClass(6, 4)
+            canvas.fill([4, -2], [9, 1], "#")
+            self.assertEqual(canvas._canvas.row(0), "    ##")
+            self.assertEqual(canvas._canvas.row(1), "    ##")
+            self.assertEqual(canvas._canvas.row(2), "      ")
+
+    def test_axis_gutters_built_once_per_size(self):
+        canvas = CanvasAxis(12, 11)
+        canvas.setPos([0, 10], "*")
+        lines = canvas.frameLines()
+        self.assertEqual(lines[0], " 0" + " " * 23)
+        self.assertEqual(lines[10], "10*" + " " * 22)
+        self.assertEqual(
+            lines[11], " ".join([" 0"] + ["  "] * 4 + [" 5"] + ["  "] * 4 + ["10", "  "])
+        )
+
+        gutters, axisLine = canvas.axisGutters()
+        self.assertIs(canvas.axisGutters()[0], gutters)
+        canvas._y = 6
+        self.assertIsNot(canvas.axisGutters()[0], gutters)
+        self.assertEqual(len(canvas.axisGutters()[0]), 6)
+
+    def test_run_is_headless(self):
+        scribe = TerminalScribe(color="red")
+        scribe.forward(25)
+        canvas = Canvas(10, 10, scribes=[scribe], framerate=10)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            frames = canvas.run(captureEvery=10)
+        self.assertEqual(output.getvalue(), "")
+        # 26 ticks (setDegrees plus 25 steps): frames 10, 20 and the last one
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[-1].frameLines(), canvas.frameLines())
+        self.assertNotEqual(frames[0].frameLines(), canvas.frameLines())
+
+    def test_random_walk_run_is_silent(self):
+        scribe = RandomWalkScribe(color="green")
+        scribe.forward(1000)
+        canvas = Canvas(30, 30, scribes=[scribe])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.run()
+        self.assertEqual(output.getvalue(), "")
+
+    def test_row_colors_are_run_length_coalesced(self):
+        canvas = Canvas(6, 1)
+        canvas.setMany([[0, 0], [1, 0], [2, 0]], "*", "red")
+        canvas.setPos([3, 0], ".")
+        canvas.setPos([4, 0], "*", "green")
+        # termcolor caches whether the terminal can do color, so force it here
+        forced = lambda text, color: "\x1b[{}m{}\x1b[0m".format(COLORS[color], text)
+        with mock.patch("canvas.grid.colored", forced):
+            line = canvas._canvas.line(0)
+        self.assertEqual(line, "\x1b[31m* * * \x1b[0m. \x1b[32m* \x1b[0m ")
+
+    def test_executor_matches_inline_ticks(self):
+        def scene(executor=None):
+            scribes = []
+            for i in range(3):
+                scribe = RobotScribe(color="red", pos=(0, i * 3))
+                scribe.right(8)
+                scribes.append(scribe)
+            return Canvas(10, 10, scribes=scribes, framerate=0, executor=executor)
+
+        inline = scene()
+        inline.run()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pooled = scene(pool)
+            pooled.run()
+        self.assertEqual(pooled.tick, inline.tick)
+        self.assertEqual(pooled.frameLines(plain=True), inline.frameLines(plain=True))
@@ -0,0 +1,30 @@
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from canvas.dense import denseLines
+
+
+class TestDenseRendering(unittest.TestCase):
+    def test_braille_packs_two_by_four(self):
+        canvas = Canvas(4, 5)
+        canvas.setPos([0, 0], ".")
+        canvas.setPos([1, 3], ".")
+        canvas.setPos([3, 4], "*", "red")
+        lines = denseLines(canvas._canvas, plain=True)
+        blank = chr(0x2800)
+        first = chr(0x2800 + 0x01 + 0x80)
+        self.assertEqual(lines, [first + blank, blank + chr(0x2808)])
+
+    def test_half_blocks(self):
+        canvas = SparseCanvas(3, 3)
+        canvas.setPos([0, 0], ".")
+        canvas.setPos([1, 1], ".")
+        canvas.fill([2, 0], [2, 2], ".")
+        lines = denseLines(canvas._canvas, "halfblock", plain=True)
+        self.assertEqual(lines, ["▀▄█", "  ▀"])
+
+    def test_large_canvas_fits_terminal(self):
+        canvas = Canvas(400, 200)
+        canvas.fill([0, 0], [399, 199], "#")
+        lines = denseLines(canvas._canvas)
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(lines[0], chr(0x28FF) * 200)
@@ -0,0 +1,77 @@
+import os
+import struct
+import unittest
+import zlib
+from canvas.base import Canvas, SparseCanvas
+from utils.image import save_canvas_to_ppm, save_canvas_to_png, export_scene_file
+from utils.io import save_canvas_to_json
+
+
+def readPngChunks(filename):
+    with open(filename, "rb") as f:
+        data = f.read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks = []
+    offset = 8
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        body = data[offset + 8 : offset + 8 + length]
+        (crc,) = struct.unpack(">I", data[offset + 8 + length : offset + 12 + length])
+        assert crc == zlib.crc32(body, zlib.crc32(kind))
+        chunks.append((kind, body))
+        offset += 12 + length
+    return chunks
+
+
+class TestImageExport(unittest.TestCase):
+    def setUp(self):
+        self.canvas = Canvas(3, 2)
+        self.canvas.setPos([0, 0], ".")
+        self.canvas.setPos([2, 1], "*", "red")
+        self.files = []
+
+    def tearDown(self):
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_ppm(self):
+        self.files.append("test_image.ppm")
+        save_canvas_to_ppm(self.canvas, "test_image.ppm")
+        with open("test_image.ppm", "rb") as f:
+            data = f.read()
+        header = b"P6\n3 2\n255\n"
+        self.assertEqual(data[: len(header)], header)
+        pixels = data[len(header) :]
+        self.assertEqual(pixels[0:3], bytes([192, 192, 192]))
+        self.assertEqual(pixels[3:6], bytes([0, 0, 0]))
+        self.assertEqual(pixels[15:18], bytes([205, 0, 0]))
+
+    def test_png(self):
+        self.files.append("test_image.png")
+        save_canvas_to_png(self.canvas, "test_image.png", scale=2)
+        chunks = readPngChunks("test_image.png")
+        self.assertEqual([kind for kind, body in chunks][0], b"IHDR")
+        self.assertEqual(struct.unpack(">II", chunks[0][1][:8]), (6, 4))
+        pixels = zlib.decompress(
+            b"".join(body for kind, body in chunks if kind == b"IDAT")
+        )
+        rows = [pixels[i * 7 : (i + 1) * 7] for i in range(4)]
+        self.assertEqual(rows[0], b"\x00\x01\x01\x00\x00\x00\x00")
+        self.assertEqual(rows[0], rows[1])
+        red = 1 + 3  # palette index of "red" after background and uncolored
+        self.assertEqual(rows[3], bytes([0, 0, 0, 0, 0, red, red]))
+
+    def test_export_scene_file(self):
+        self.files += ["test_scene.json", "test_scene.png"]
+        canvas = SparseCanvas(500, 500, scribes=[])
+        canvas.setPos([400, 100], "*", "green")
+        save_canvas_to_json(canvas, "test_scene.json")
+        export_scene_file("test_scene.json", "test_scene.png")
+        chunks = readPngChunks("test_scene.png")
+        pixels = zlib.decompress(
+            b"".join(body for kind, body in chunks if kind == b"IDAT")
+        )
+        self.assertEqual(len(pixels), 500 * 501)
+        self.assertNotEqual(pixels[100 * 501 + 1 + 400], 0)
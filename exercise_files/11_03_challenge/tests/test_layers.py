@@ -0,0 +1,62 @@
+import time
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from canvas.exceptions import TerminalScribeException
+from scribes.robot import RobotScribe
+
+
+class TestLayers(unittest.TestCase):
+    def test_axes_survive_scribes(self):
+        canvas = Canvas(11, 11)
+        canvas.drawAxes()
+        canvas.addTitle("Waves")
+        self.assertEqual(canvas._canvas.row(0), "Waves|     ")
+        self.assertEqual(canvas._canvas.row(5), "-----+-----")
+
+        canvas.setPos([5, 5], "*", "green")
+        self.assertEqual(canvas._canvas.get(5, 5), "*")
+        canvas.setPos([5, 5], " ")
+        self.assertEqual(canvas._canvas.get(5, 5), "+")
+        self.assertEqual(canvas._layers["background"].get(5, 5), "+")
+
+    def test_scribes_draw_over_background(self):
+        canvas = SparseCanvas(10, 10)
+        canvas.drawAxes()
+        scribe = RobotScribe(color="red", pos=(0, 5))
+        scribe.right(3)
+        for move, args in scribe.steps():
+            move(*args, canvas)
+        self.assertEqual(canvas._canvas.row(5), "...*-+----")
+
+    def test_dynamic_layer_on_top(self):
+        canvas = Canvas(5, 1)
+        canvas.addLayer("overlay", static=False)
+        canvas.setPos([1, 0], "o", layer="overlay")
+        canvas.setPos([1, 0], "*")
+        self.assertEqual(canvas._canvas.get(1, 0), "o")
+        canvas.setPos([1, 0], " ", layer="overlay")
+        self.assertEqual(canvas._canvas.get(1, 0), "*")
+
+        with self.assertRaises(TerminalScribeException):
+            canvas.setPos([0, 0], "x", layer="missing")
+
+    def test_layers_round_trip(self):
+        canvas = Canvas(9, 9)
+        canvas.drawAxes()
+        canvas.setPos([1, 4], "*")
+        loaded = Canvas.fromDict(canvas.toDict())
+        self.assertEqual(loaded.frameLines(), canvas.frameLines())
+        loaded.setPos([1, 4], " ")
+        self.assertEqual(loaded._canvas.get(1, 4), "-")
+
+    def test_load_rebuilds_background_from_populated_cells(self):
+        canvas = SparseCanvas(3000, 3000)
+        canvas.addTitle("Hi")
+        canvas.setPos([2500, 2500], "*", "red")
+        start = time.perf_counter()
+        loaded = Canvas.fromDict(canvas.toDict())
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(loaded._background.row(0, 0, 3), "Hi ")
+        self.assertEqual(loaded._canvas.get(2500, 2500), "*")
+        loaded.setPos([1, 0], " ")
+        self.assertEqual(loaded._canvas.get(1, 0), "i")
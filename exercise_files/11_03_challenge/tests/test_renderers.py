@@ -0,0 +1,220 @@
+import io
+import json
+import os
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from canvas.base import Canvas, CanvasAxis
+from canvas.renderers import (
+    Renderer,
+    NullRenderer,
+    DiffRenderer,
+    TextFileRenderer,
+    AsciicastRenderer,
+    ThreadedRenderer,
+    FitRenderer,
+)
+from canvas.frame import FrameWriter
+from canvas.grid import ANSI_ESCAPE
+from scribes.robot import RobotScribe
+
+
+class CountingRenderer(Renderer):
+    def __init__(self):
+        self.calls = []
+
+    def start(self, canvas):
+        self.calls.append("start")
+
+    def frame(self, canvas):
+        self.calls.append("frame")
+
+    def stop(self, canvas):
+        self.calls.append("stop")
+
+
+def robotCanvas(canvasClass=Canvas):
+    scribe = RobotScribe(color="yellow")
+    scribe.right(3)
+    return canvasClass(6, 3, scribes=[scribe], framerate=0)
+
+
+class TestRenderers(unittest.TestCase):
+    def test_go_calls_renderer_per_tick(self):
+        renderer = CountingRenderer()
+        robotCanvas().go(renderer=renderer)
+        # setDegrees, setDirection and three steps
+        self.assertEqual(renderer.calls, ["start"] + ["frame"] * 5 + ["stop"])
+
+    def test_null_renderer_is_silent(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            robotCanvas().go(renderer=NullRenderer())
+        self.assertEqual(output.getvalue(), "")
+
+    def test_diff_renderer_writes_changes_after_first_frame(self):
+        canvas = robotCanvas()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            canvas.go(renderer=DiffRenderer())
+        frames = output.getvalue()
+        self.assertEqual(frames.count("\x1b[2J"), 1)
+        self.assertIn("\x1b[1;5H. ", frames)
+
+    def test_text_file_renderer_writes_plain_frames(self):
+        path = "test_frames.tmp"
+        try:
+            robotCanvas(CanvasAxis).go(renderer=TextFileRenderer(path))
+            with open(path) as f:
+                text = f.read()
+            self.assertNotIn("\x1b", text)
+            self.assertEqual(text.splitlines()[0], " 0. . . *    ")
+
+            robotCanvas().go(renderer=TextFileRenderer(path, everyFrame=True))
+            with open(path) as f:
+                self.assertEqual(f.read().count("\f"), 5)
+        finally:
+            os.remove(path)
+
+    def test_asciicast_records_diffs_on_simulation_clock(self):
+        path = "test_run.cast"
+        try:
+            canvas = robotCanvas()
+            canvas.framerate = 10
+            canvas.run(renderer=AsciicastRenderer(path, tickInterval=0.5))
+            with open(path) as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+            self.assertEqual(header["version"], 2)
+            self.assertEqual(header["width"], 11)
+            events = [json.loads(line) for line in lines[1:]]
+            self.assertEqual(events[0][0], 0.5)
+            self.assertTrue(events[0][2].startswith("\x1b[H\x1b[2J"))
+            self.assertIn("\r\n", events[0][2])
+            # Ticks with no changed cells (direction changes) produce no event
+            self.assertEqual([event[0] for event in events[1:]], [1.5, 2.0, 2.5])
+            for event in events[1:]:
+                self.assertTrue(event[2].startswith("\x1b[1;"))
+        finally:
+            os.remove(path)
+
+
+class SlowRecordingRenderer(Renderer):
+    def __init__(self):
+        self.frames = []
+        self.changed = set()
+        self.threads = set()
+
+    def frame(self, canvas):
+        time.sleep(0.01)
+        self.threads.add(threading.current_thread())
+        self.changed.update(canvas._canvas.takeDirty())
+        self.frames.append(canvas.frameLines(plain=True))
+
+
+class TestThreadedRenderer(unittest.TestCase):
+    def test_slow_renderer_does_not_block_simulation(self):
+        for policy in ["drop", "coalesce"]:
+            scribe = RobotScribe(color="green")
+            scribe.drawSquare(5)
+            canvas = Canvas(8, 8, scribes=[scribe], framerate=0)
+            inner = SlowRecordingRenderer()
+            renderer = ThreadedRenderer(inner, maxFrames=2, policy=policy)
+            canvas.run(renderer=renderer)
+
+            self.assertNotIn(threading.current_thread(), inner.threads)
+            self.assertGreater(renderer.dropped, 0)
+            self.assertLess(len(inner.frames), canvas.tick)
+            self.assertEqual(inner.frames[-1], canvas.frameLines(plain=True))
+            # Cells changed in dropped frames were still handed to the renderer
+            self.assertEqual(len(inner.changed), 20)
+
+    def test_writer_errors_propagate(self):
+        class BrokenRenderer(Renderer):
+            def frame(self, canvas):
+                raise ValueError("broken renderer")
+
+        # Raised from a later frame() or, at the latest, from stop()
+        with self.assertRaises(ValueError):
+            robotCanvas().run(renderer=ThreadedRenderer(BrokenRenderer()))
+
+        renderer = ThreadedRenderer(BrokenRenderer())
+        canvas = robotCanvas()
+        renderer.start(canvas)
+        renderer.frame(canvas)
+        renderer._thread.join()
+        with self.assertRaises(ValueError):
+            renderer.frame(canvas)
+        renderer.stop(canvas)
+
+
+class TestFitRenderer(unittest.TestCase):
+    def render(self, renderer, canvas):
+        output = io.StringIO()
+        renderer.writer = FrameWriter(output)
+        renderer.frame(canvas)
+        # Visible text only; whether colors are emitted depends on the terminal
+        text = output.getvalue().replace("\x1b[H\x1b[2J", "")
+        return ANSI_ESCAPE.sub("", text).splitlines()
+
+    def test_scale_fits_whole_canvas(self):
+        canvas = Canvas(400, 100)
+        canvas.setPos([399, 99], "*", "red")
+        size = [80, 25]
+        renderer = FitRenderer("scale", terminalSize=lambda: tuple(size))
+        lines = self.render(renderer, canvas)
+        self.assertLessEqual(len(lines), 24)
+        self.assertTrue(all(len(line) <= 80 for line in lines))
+        self.assertEqual(renderer.viewport.zoom, 10)
+        self.assertIn("*", lines[-1])
+
+        size[:] = [200, 60]
+        self.render(renderer, canvas)
+        self.assertEqual(renderer.viewport.zoom, 4)
+
+    def test_clip_keeps_cells_one_to_one(self):
+        canvas = Canvas(400, 100)
+        canvas.setPos([3, 2], "*")
+        renderer = FitRenderer("clip", terminalSize=lambda: (41, 11))
+        lines = self.render(renderer, canvas)
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(len(lines[0]), 41)
+        self.assertEqual(lines[2][6], "*")
+        self.assertEqual(renderer.viewport.zoom, 1)
+
+    def test_scale_keeps_axis_gutters(self):
+        canvas = CanvasAxis(40, 40)
+        canvas.setPos([39, 39], "*", "red")
+        renderer = FitRenderer("scale", terminalSize=lambda: (80, 24))
+        lines = self.render(renderer, canvas)
+        self.assertLessEqual(len(lines), 23)
+        self.assertTrue(all(len(line) <= 80 for line in lines))
+        self.assertEqual(renderer.viewport.zoom, 2)
+        self.assertEqual(lines[0][:2], " 0")
+        self.assertEqual(lines[5][:2], "10")
+        self.assertEqual(lines[-1].split()[:3], ["0", "5", "10"])
+        self.assertIn("*", lines[-2])
+
+    def test_rechecks_terminal_size_every_frame(self):
+        canvas = Canvas(40, 10)
+        canvas.setPos([39, 9], "*")
+        size = [120, 40]
+        inner = DiffRenderer()
+        renderer = FitRenderer("scale", terminalSize=lambda: tuple(size), whenFits=inner)
+        renderer.start(canvas)
+        inner.writer = renderer.writer = FrameWriter(io.StringIO())
+        lines = self.render(renderer, canvas)
+        self.assertEqual(inner.writer.stream.getvalue().count("*"), 1)
+        self.assertEqual(lines, [])
+
+        size[:] = [40, 6]
+        lines = self.render(renderer, canvas)
+        self.assertLessEqual(len(lines), 5)
+        self.assertEqual(renderer.viewport.zoom, 2)
+
+        size[:] = [120, 40]
+        inner.writer = FrameWriter(io.StringIO())
+        self.render(renderer, canvas)
+        # Back to the inner renderer, which redraws the whole canvas
+        self.assertEqual(len(inner.writer.stream.getvalue().splitlines()), 10)
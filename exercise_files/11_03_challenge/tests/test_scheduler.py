@@ -0,0 +1,44 @@
+import unittest
+from canvas.scheduler import FixedTimestep
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestFixedTimestep(unittest.TestCase):
+    def test_ticks_do_not_drift_with_render_time(self):
+        clock = FakeClock()
+        scheduler = FixedTimestep(0.1, clock=clock, sleep=clock.sleep)
+
+        def render():
+            clock.now += 0.03
+
+        stats = scheduler.run(iter(range(10)), render)
+        self.assertEqual(stats["ticks"], 10)
+        self.assertEqual(stats["frames"], 10)
+        self.assertAlmostEqual(stats["elapsed"], 1.0)
+        self.assertFalse(stats["overBudget"])
+
+    def test_slow_renders_drop_frames(self):
+        clock = FakeClock()
+        scheduler = FixedTimestep(0.01, 0.05, clock=clock, sleep=clock.sleep)
+        rendered = []
+
+        def render():
+            rendered.append(clock.now)
+            clock.now += 0.12
+
+        stats = scheduler.run(iter(range(100)), render)
+        self.assertEqual(stats["ticks"], 100)
+        self.assertGreater(stats["droppedFrames"], 0)
+        self.assertLess(stats["frames"], 100 * 0.01 / 0.05)
+        self.assertTrue(stats["overBudget"])
+        self.assertAlmostEqual(stats["tickRate"], 100 / stats["elapsed"])
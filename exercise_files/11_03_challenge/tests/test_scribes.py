@@ -2,6 +2,10 @@ import unittest
 from scribes.plot import PlotScribe
 from utils.functions import sine
 from canvas.base import Canvas
+from canvas.exceptions import InvalidParameter
+from scribes.base import TerminalScribe
+from scribes.random_walk import RandomWalkScribe
+from scribes.robot import RobotScribe
 
 
 class TestPlotScribe(unittest.TestCase):
@@ -12,3 +16,87 @@ class TestPlotScribe(unittest.TestCase):
 
         canvas = Canvas(20, 20, scribes=[scribe])
         canvas.go()
+
+
+class TestMoveStreams(unittest.TestCase):
+    def test_forward_is_one_entry(self):
+        scribe = RandomWalkScribe(color="green")
+        scribe.forward(1000)
+        self.assertEqual(len(scribe.moves), 2)
+        steps = scribe.steps()
+        self.assertEqual(next(steps)[0], scribe._setDegrees)
+        for i in range(10):
+            next(steps)
+        self.assertEqual(scribe.moves[0][1], 995)
+        self.assertEqual(len(list(steps)), 1990)
+        self.assertEqual(len(scribe.moves), 0)
+
+    def test_serializes_remaining_program(self):
+        scribe = RobotScribe(color="blue")
+        scribe.right(5)
+        steps = scribe.steps()
+        for i in range(3):
+            next(steps)
+        data = scribe.toDict()
+        self.assertEqual(data["moves"], [[[["_forward", []]], 4]])
+
+        loaded = TerminalScribe.fromDict(data)
+        names = [move.__name__ for move, args in loaded.steps()]
+        self.assertEqual(names, ["_forward"] * 4)
+
+    def test_keeps_the_rest_of_a_pass(self):
+        scribe = RandomWalkScribe(color="green")
+        scribe.forward(3)
+        steps = scribe.steps()
+        next(steps)
+        self.assertEqual(next(steps)[0], scribe._randomizeDegrees)
+        pass_ = [["_randomizeDegrees", []], ["_forward", []]]
+        self.assertEqual(scribe.toDict()["moves"], [["_forward", []], [pass_, 2]])
+
+    def test_rejects_bad_repeats(self):
+        scribe = TerminalScribe()
+        with self.assertRaises(InvalidParameter):
+            scribe.forward(2.5)
+        with self.assertRaises(InvalidParameter):
+            scribe.repeat([], None)
+
+    def test_loads_one_entry_per_move(self):
+        data = TerminalScribe(color="red").toDict()
+        data["moves"] = [
+            ["_setDirection", [[1, 0]]],
+            ["_forward", []],
+            ["_forward", []],
+        ]
+        scribe = TerminalScribe.fromDict(data)
+        canvas = Canvas(5, 1, scribes=[scribe])
+        canvas.run()
+        self.assertEqual(canvas._canvas.row(0), "..*  ")
+
+    def test_unbounded_program(self):
+        scribe = RobotScribe(color="red")
+        scribe.right(None)
+        canvas = Canvas(10, 10, scribes=[scribe])
+        ticks = canvas._ticks()
+        for i in range(100):
+            next(ticks)
+        self.assertEqual(canvas.tick, 100)
+        self.assertEqual(len(scribe.moves), 1)
+
+    def test_generated_moves(self):
+        scribe = RobotScribe(color="red")
+
+        def zigzag():
+            while True:
+                yield scribe._setDirection, [[1, 0]]
+                yield scribe._forward, []
+                yield scribe._setDirection, [[0, 1]]
+                yield scribe._forward, []
+
+        scribe.moves.append(zigzag())
+        canvas = Canvas(10, 10, scribes=[scribe])
+        ticks = canvas._ticks()
+        for i in range(13):
+            next(ticks)
+        self.assertEqual(scribe.pos, [3, 3])
+        with self.assertRaises(InvalidParameter):
+            scribe.toDict()
@@ -0,0 +1,113 @@
+import math
+import os
+import random
+import time
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from canvas.exceptions import TerminalScribeException
+from scribes.plot import PlotScribe
+from scribes.random_walk import RandomWalkScribe
+from scribes.robot import RobotScribe
+from tests.scenes import crossingScene
+
+
+class SlowScribe(RobotScribe):
+    # Draws after the other workers, so its write lands last in real time
+    def _forward(self, canvas):
+        time.sleep(0.02)
+        super()._forward(canvas)
+
+
+def crowdedScene(axes=False):
+    # Scribes that cross each other's paths on the same ticks
+    scribes = []
+    for i in range(6):
+        robot = RobotScribe(color="red" if i % 2 else "blue", pos=(i, i))
+        robot.drawSquare(8 - i)
+        scribes.append(robot)
+    bouncer = RobotScribe(color="green", pos=(2, 0), degrees=135)
+    bouncer.forward(40)
+    scribes.append(bouncer)
+    plot = PlotScribe(domain=(0, 20), color="yellow")
+    plot.plotX(lambda x: 5 + 4 * math.sin(x / 3))
+    scribes.append(plot)
+    canvas = Canvas(20, 12, scribes=scribes, framerate=0)
+    if axes:
+        canvas.drawAxes()
+    return canvas
+
+
+class TestRunSharded(unittest.TestCase):
+    def assertSameCanvas(self, canvas, expected):
+        self.assertEqual(canvas.tick, expected.tick)
+        for y in range(expected._y):
+            self.assertEqual(canvas._canvas.row(y), expected._canvas.row(y))
+            self.assertEqual(canvas._canvas.colors(y), expected._canvas.colors(y))
+
+    def test_matches_serial_run(self):
+        serial = crowdedScene()
+        serial.run()
+        for processes in (1, 3):
+            sharded = crowdedScene()
+            stats = sharded.runSharded(processes)
+            self.assertEqual(stats["processes"], processes)
+            self.assertEqual(stats["ticks"], serial.tick)
+            self.assertSameCanvas(sharded, serial)
+            for scribe, expected in zip(sharded.scribes, serial.scribes):
+                self.assertEqual(scribe.pos, expected.pos)
+
+    def test_same_cell_resolves_in_scribe_order(self):
+        # Serially the blue trail is drawn after the red head and wins
+        serial = crossingScene(leftClass=SlowScribe)
+        serial.run()
+        sharded = crossingScene(leftClass=SlowScribe)
+        sharded.runSharded(3)
+        self.assertEqual(sharded._canvas.get(5, 2), ".")
+        self.assertSameCanvas(sharded, serial)
+
+    def test_layers_stay_below_scribes(self):
+        serial = crowdedScene(axes=True)
+        serial.run()
+        sharded = crowdedScene(axes=True)
+        sharded.runSharded(2)
+        self.assertSameCanvas(sharded, serial)
+
+    def test_worker_errors_propagate(self):
+        canvas = crowdedScene()
+        outside = (lambda canvas: canvas.setPos([99, 0], "*"), [])
+        canvas.scribes[3].moves.insert(2, outside)
+        with self.assertRaises(TerminalScribeException):
+            canvas.runSharded(3)
+
+    def test_sparse_canvas_is_refused(self):
+        scribe = RobotScribe(color="red")
+        scribe.right(3)
+        canvas = SparseCanvas(100000, 100000, scribes=[scribe])
+        with self.assertRaises(TerminalScribeException):
+            canvas.runSharded(1)
+
+    def test_killed_worker_fails_the_run(self):
+        canvas = crossingScene()
+        crash = (lambda canvas: os._exit(3), [])
+        canvas.scribes[1].moves.insert(2, crash)
+        start = time.perf_counter()
+        with self.assertRaises(TerminalScribeException):
+            canvas.runSharded(2)
+        self.assertLess(time.perf_counter() - start, 10)
+
+    def test_random_walks_match_serial_run(self):
+        def walkers():
+            random.seed(3)
+            scribes = []
+            for i in range(3):
+                scribe = RandomWalkScribe(color="green", pos=(5 + i, 5))
+                scribe.forward(20)
+                scribes.append(scribe)
+            return Canvas(15, 15, scribes=scribes, framerate=0)
+
+        serial = walkers()
+        serial.run()
+        for processes in (1, 2):
+            sharded = walkers()
+            sharded.runSharded(processes)
+            self.assertSameCanvas(sharded, serial)
@@ -0,0 +1,56 @@
+import os
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from canvas.exceptions import TerminalScribeException
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_snapshot_is_isolated_from_later_writes(self):
+        for canvasClass in [Canvas, SparseCanvas]:
+            canvas = canvasClass(100, 100)
+            canvas.setPos([1, 1], "*", "green")
+            snapshot = canvas.snapshot()
+
+            canvas.setPos([1, 1], ".")
+            canvas.setPos([90, 90], "*")
+            self.assertEqual(snapshot._canvas.get(1, 1), "*")
+            self.assertEqual(snapshot._canvas.getColor(1, 1), "green")
+            self.assertEqual(snapshot._canvas.get(90, 90), " ")
+            self.assertEqual(canvas._canvas.get(1, 1), ".")
+
+            with self.assertRaises(TerminalScribeException):
+                snapshot.setPos([2, 2], "*")
+
+    def test_snapshot_shares_untouched_rows(self):
+        canvas = Canvas(10, 10)
+        snapshot = canvas.snapshot()
+        canvas.setPos([3, 4], "*")
+        self.assertIs(snapshot._canvas._glyphs[0], canvas._canvas._glyphs[0])
+        self.assertIsNot(snapshot._canvas._glyphs[4], canvas._canvas._glyphs[4])
+
+    def test_background_to_file(self):
+        canvas = Canvas(20, 20)
+        canvas.setPos([5, 5], "*", "red")
+        thread = canvas.toFile("test_canvas", background=True)
+        canvas.setPos([5, 5], ".")
+        thread.join()
+        try:
+            loaded = Canvas.fromFile("test_canvas")
+            self.assertEqual(loaded._canvas.get(5, 5), "*")
+            self.assertEqual(loaded._canvas.getColor(5, 5), "red")
+        finally:
+            os.remove("test_canvas.json")
+
+    def test_background_to_file_keeps_layers(self):
+        canvas = Canvas(9, 9)
+        canvas.drawAxes()
+        thread = canvas.toFile("test_canvas", background=True)
+        thread.join()
+        try:
+            loaded = Canvas.fromFile("test_canvas")
+            self.assertEqual(loaded._layerOrder, ["background", "scribes"])
+            loaded.setPos([4, 4], "*")
+            loaded.setPos([4, 4], " ")
+            self.assertEqual(loaded._canvas.get(4, 4), "+")
+        finally:
+            os.remove("test_canvas.json")
@@ -0,0 +1,42 @@
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from scribes.base import TerminalScribe
+
+
+class TestSparseCanvas(unittest.TestCase):
+    def test_tiles_allocated_on_write(self):
+        canvas = SparseCanvas(100000, 100000)
+        self.assertEqual(len(canvas._canvas._tiles), 0)
+        self.assertEqual(canvas._canvas.get(500, 500), " ")
+
+        canvas.setPos([70000, 123], "*", "red")
+        canvas.setPos([70001, 124], ".")
+        self.assertEqual(len(canvas._canvas._tiles), 1)
+        self.assertEqual(canvas._canvas.get(70000, 123), "*")
+        self.assertEqual(canvas._canvas.getColor(70000, 123), "red")
+        self.assertTrue(canvas.hitsWall([100000, 5]))
+
+    def test_serializes_only_populated_tiles(self):
+        canvas = SparseCanvas(1000, 1000)
+        canvas.setPos([10, 10], "*", "blue")
+        canvas.setPos([999, 999], ".")
+        data = canvas.toDict()
+        self.assertEqual(len(data["tiles"]), 2)
+        self.assertNotIn("canvas", data)
+
+        loaded = Canvas.fromDict(data)
+        self.assertIsInstance(loaded, SparseCanvas)
+        self.assertEqual(loaded.toDict(), data)
+
+    def test_matches_dense_canvas(self):
+        dense = Canvas(150, 70)
+        sparse = SparseCanvas(150, 70)
+        for canvas in [dense, sparse]:
+            scribe = TerminalScribe(color="green", pos=(3, 3))
+            scribe.forward(300)
+            for move, args in scribe.steps():
+                move(*args, canvas)
+        for y in range(70):
+            self.assertEqual(sparse._canvas.row(y), dense._canvas.row(y))
+            self.assertEqual(sparse._canvas.colors(y), dense._canvas.colors(y))
+        self.assertEqual(sparse.frameLines(), dense.frameLines())
@@ -0,0 +1,42 @@
+import random
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from canvas.base import Canvas
+from canvas.tick import TickBuffer
+from scribes.robot import RobotScribe
+from tests.scenes import crossingScene
+
+
+class JitteryScribe(RobotScribe):
+    # Sleeps a random moment before drawing, to shuffle thread timing
+    def _forward(self, canvas):
+        time.sleep(random.random() / 1000)
+        super()._forward(canvas)
+
+
+class TestTickBuffers(unittest.TestCase):
+    def test_buffer_defers_writes(self):
+        canvas = Canvas(5, 5)
+        buffer = TickBuffer(canvas)
+        buffer.setPos([1, 1], "*", "red")
+        self.assertEqual(buffer.setMany([[2, 2], [7, 7]], "."), [[7, 7]])
+        self.assertTrue(buffer.hitsWall([5, 0]))
+        self.assertEqual(canvas._canvas.get(1, 1), " ")
+
+        buffer.apply()
+        self.assertEqual(canvas._canvas.get(1, 1), "*")
+        self.assertEqual(canvas._canvas.get(2, 2), ".")
+
+    def test_concurrent_ticks_match_serial(self):
+        serial = crossingScene(JitteryScribe)
+        serial.run()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for attempt in range(10):
+                concurrent = crossingScene(JitteryScribe, executor=pool)
+                concurrent.run()
+                for y in range(5):
+                    self.assertEqual(concurrent._canvas.row(y), serial._canvas.row(y))
+                    self.assertEqual(
+                        concurrent._canvas.colors(y), serial._canvas.colors(y)
+                    )
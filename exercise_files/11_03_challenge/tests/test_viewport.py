@@ -0,0 +1,40 @@
+import unittest
+from canvas.base import Canvas, SparseCanvas
+from canvas.exceptions import InvalidParameter
+from canvas.viewport import Viewport
+
+
+class TestViewport(unittest.TestCase):
+    def test_window_and_pan(self):
+        canvas = Canvas(100, 50)
+        canvas.setPos([10, 5], "*")
+        canvas.setPos([12, 6], ".")
+        viewport = Viewport(canvas, 4, 2, x=9, y=5)
+        self.assertEqual(viewport.frameLines(plain=True), ["  *    ", "      ."])
+
+        viewport.pan(-1, 0)
+        self.assertEqual(viewport.frameLines(plain=True)[0], "    *  ")
+        viewport.moveTo(1000, 1000)
+        self.assertEqual((viewport.x, viewport.y), (96, 48))
+
+    def test_zoomed_out_aggregates_blocks(self):
+        canvas = SparseCanvas(1000, 1000)
+        canvas.fill([0, 0], [3, 3], ".")
+        canvas.setPos([5, 1], "*", "red")
+        viewport = Viewport(canvas, 3, 2, zoom=4)
+        lines = viewport.frameLines(plain=True)
+        self.assertEqual(lines, ["@ *  ", "     "])
+
+        viewport.zoomIn()
+        self.assertEqual(viewport.zoom, 2)
+        with self.assertRaises(InvalidParameter):
+            viewport.setZoom(0)
+
+    def test_render_reads_only_visible_cells(self):
+        canvas = SparseCanvas(100000, 100000)
+        canvas.setPos([50001, 50001], "*")
+        viewport = Viewport(canvas, 10, 5)
+        viewport.centerOn(50000, 50000)
+        lines = viewport.frameLines(plain=True)
+        self.assertEqual(len(lines), 5)
+        self.assertIn("*", "".join(lines))
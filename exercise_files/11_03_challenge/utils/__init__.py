@@ -1,6 +1,7 @@
 from .functions import sine, cosine, circleTop, circleBottom
 from .io import save_canvas_to_json, load_canvas_from_json
 from .validation import is_number
+from .image import save_canvas_to_ppm, save_canvas_to_png, export_scene_file
 
 __all__ = [
     "sine",
@@ -10,4 +11,7 @@ __all__ = [
     "save_canvas_to_json",
     "load_canvas_from_json",
     "is_number",
+    "save_canvas_to_ppm",
+    "save_canvas_to_png",
+    "export_scene_file",
 ]
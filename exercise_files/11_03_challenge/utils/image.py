@@ -0,0 +1,100 @@
+import struct
+import zlib
+from canvas.grid import BLANK, PALETTE
+
+# Approximate xterm RGB values for termcolor's color names
+RGB = {
+    "black": (0, 0, 0),
+    "grey": (0, 0, 0),
+    "red": (205, 0, 0),
+    "green": (0, 205, 0),
+    "yellow": (205, 205, 0),
+    "blue": (0, 0, 238),
+    "magenta": (205, 0, 205),
+    "cyan": (0, 205, 205),
+    "light_grey": (229, 229, 229),
+    "dark_grey": (127, 127, 127),
+    "light_red": (255, 0, 0),
+    "light_green": (0, 255, 0),
+    "light_yellow": (255, 255, 0),
+    "light_blue": (92, 92, 255),
+    "light_magenta": (255, 0, 255),
+    "light_cyan": (0, 255, 255),
+    "white": (255, 255, 255),
+}
+BACKGROUND = (0, 0, 0)
+# Marks drawn without a color (trails, axes, titles)
+UNCOLORED = (192, 192, 192)
+
+# Pixel index 0 is the background, 1 an uncolored mark and 1 + i the
+# grid palette color i
+PIXEL_COLORS = [BACKGROUND, UNCOLORED] + [
+    RGB.get(color, RGB["white"]) for color in PALETTE[1:]
+]
+PNG_CHUNK_SIZE = 1 << 16
+
+
+def _pixel_rows(canvas, scale):
+    # Yields one row of pixel indexes at a time so memory stays bounded
+    grid = canvas._canvas
+    for y in range(grid.height):
+        colors = grid.colors(y)
+        row = bytes(
+            colors[x] + 1 if colors[x] else (0 if glyph == BLANK else 1)
+            for x, glyph in enumerate(grid.row(y))
+        )
+        if scale > 1:
+            row = bytes(index for index in row for i in range(scale))
+        for i in range(scale):
+            yield row
+
+
+def _size(canvas, scale):
+    return canvas._canvas.width * scale, canvas._canvas.height * scale
+
+
+def save_canvas_to_ppm(canvas, filename, scale=1):
+    width, height = _size(canvas, scale)
+    rgb = [bytes(color) for color in PIXEL_COLORS]
+    with open(filename, "wb") as f:
+        f.write("P6\n{} {}\n255\n".format(width, height).encode())
+        for row in _pixel_rows(canvas, scale):
+            f.write(b"".join(rgb[index] for index in row))
+
+
+def _png_chunk(f, kind, data):
+    f.write(struct.pack(">I", len(data)))
+    f.write(kind)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+
+def save_canvas_to_png(canvas, filename, scale=1):
+    # Palette PNG (one byte per pixel), compressed row by row
+    width, height = _size(canvas, scale)
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        _png_chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+        _png_chunk(f, b"PLTE", b"".join(bytes(color) for color in PIXEL_COLORS))
+        compressor = zlib.compressobj(9)
+        pending = b""
+        for row in _pixel_rows(canvas, scale):
+            # Filter type 0 (none) before each row
+            pending += compressor.compress(b"\x00" + row)
+            if len(pending) >= PNG_CHUNK_SIZE:
+                _png_chunk(f, b"IDAT", pending)
+                pending = b""
+        pending += compressor.flush()
+        _png_chunk(f, b"IDAT", pending)
+        _png_chunk(f, b"IEND", b"")
+
+
+def export_scene_file(scene_filename, image_filename, scale=1):
+    # Renders a saved scene (.json) to .png or .ppm, chosen by extension
+    from .io import load_canvas_from_json
+
+    canvas = load_canvas_from_json(scene_filename)
+    if image_filename.endswith(".ppm"):
+        save_canvas_to_ppm(canvas, image_filename, scale)
+    else:
+        save_canvas_to_png(canvas, image_filename, scale)
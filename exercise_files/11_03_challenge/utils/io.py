@@ -1,6 +1,4 @@
 import json
-# Update the import path below if 'Canvas' is located elsewhere
-from canvas import Canvas, CanvasAxis
 
 
 def save_canvas_to_json(canvas, filename):
@@ -9,6 +7,9 @@ def save_canvas_to_json(canvas, filename):
 
 
 def load_canvas_from_json(filename):
+    # Imported here to avoid a circular import (canvas.base -> utils -> canvas)
+    from canvas import Canvas
+
     with open(filename, "r") as f:
         data = json.load(f)
         return Canvas.fromDict(data)